@@ -0,0 +1,173 @@
+import json
+import statistics
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.http import Http404
+from django.test import RequestFactory
+
+from demo.example.models import Institution, Person, Subject
+from demo.example.views import FancyInstitutionList, FancyPersonList, FancySubjectList
+from itemlist.signals import list_timed
+
+PHASES = ['filters', 'search', 'facets', 'count', 'page', 'headers', 'render']
+
+SCENARIOS = {
+    'people': (FancyPersonList, {
+        'first': {},
+        'search': {'search': 'john'},
+        'filter': {'type__exact': 'admin'},
+        'sort': {'order': '-1'},
+        'deep': {'page': '50'},
+    }),
+    'institutions': (FancyInstitutionList, {
+        'first': {},
+        'search': {'search': 'physics'},
+        'filter': {'parent__isnull': 'True'},
+        'sort': {'order': '-2'},
+        'deep': {'page': '50'},
+    }),
+    'subjects': (FancySubjectList, {
+        'first': {},
+        'search': {'search': 'physics'},
+        'sort': {'order': '-1'},
+        'deep': {'page': '5'},
+    }),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the person, institution and subject lists on the configured database. The time and queries of '
+        'every phase of the list requests and their peak memory are reported, and can be saved as a baseline and '
+        'compared with a previous baseline. Use generate_data to create a large dataset first.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Number of requests per scenario')
+        parser.add_argument(
+            '--lists', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS), help='Lists to benchmark'
+        )
+        parser.add_argument('--save', metavar='FILE', help='Save the results as a JSON baseline')
+        parser.add_argument('--compare', metavar='FILE', help='Compare the results with a JSON baseline')
+        parser.add_argument(
+            '--threshold', type=float, default=10.0, help='Percentage above which changes are highlighted'
+        )
+
+    def run(self, view_class, params):
+        response = view_class.as_view(record_timings=True)(RequestFactory().get('/', params))
+        response.render()
+        return response
+
+    def measure(self, view_class, params, repeat):
+        """
+        Request the list `repeat` times after a warm-up request, then once more while tracing memory allocations
+        :return: dict with the median 'duration' in seconds, the 'queries', the 'peak_memory' in bytes and the
+            median 'duration' and 'queries' of each phase
+        """
+        records = []
+
+        def receiver(record, **kwargs):
+            records.append(record)
+
+        list_timed.connect(receiver)
+        try:
+            self.run(view_class, params)
+            del records[:]
+            for _ in range(repeat):
+                self.run(view_class, params)
+            tracemalloc.start()
+            try:
+                self.run(view_class, params)
+                peak_memory = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        finally:
+            list_timed.disconnect(receiver)
+
+        records = records[:repeat]
+        phases = {}
+        for name in PHASES:
+            timings = [record['phases'][name] for record in records if name in record['phases']]
+            if timings:
+                phases[name] = {
+                    'duration': statistics.median(timing['duration'] for timing in timings),
+                    'queries': timings[-1]['queries'],
+                }
+        return {
+            'duration': statistics.median(record['duration'] for record in records),
+            'queries': sum(phase['queries'] for phase in phases.values()),
+            'peak_memory': peak_memory,
+            'phases': phases,
+        }
+
+    def format_change(self, current, previous, threshold):
+        if not previous:
+            return ''
+        change = (current - previous) * 100 / previous
+        marker = ' !' if change > threshold else ' *' if change < -threshold else ''
+        return f' ({change:+.0f}%{marker})'
+
+    def report(self, name, result, baseline, threshold):
+        previous = baseline.get(name, {})
+        self.stdout.write(
+            f'{name:<20} {result["duration"] * 1e3:9.1f} ms'
+            f'{self.format_change(result["duration"], previous.get("duration"), threshold):<10}'
+            f' {result["queries"]:3d} queries'
+            f'{self.format_change(result["queries"], previous.get("queries"), 0):<8}'
+            f' {result["peak_memory"] / 1024:9.0f} KiB'
+            f'{self.format_change(result["peak_memory"], previous.get("peak_memory"), threshold)}'
+        )
+        for phase, timing in result['phases'].items():
+            previous_phase = previous.get('phases', {}).get(phase, {})
+            self.stdout.write(
+                f'    {phase:<16} {timing["duration"] * 1e3:9.1f} ms'
+                f'{self.format_change(timing["duration"], previous_phase.get("duration"), threshold):<10}'
+                f' {timing["queries"]:3d} queries'
+                f'{self.format_change(timing["queries"], previous_phase.get("queries"), 0)}'
+            )
+
+    def handle(self, *args, **options):
+        baseline = {}
+        if options['compare']:
+            try:
+                with open(options['compare']) as baseline_file:
+                    baseline = json.load(baseline_file)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Unable to read the baseline: {e}')
+
+        rows = {
+            'people': Person.objects.count(),
+            'institutions': Institution.objects.count(),
+            'subjects': Subject.objects.count(),
+        }
+        self.stdout.write(
+            f'{connection.vendor}: ' + ', '.join(f'{count} {name}' for name, count in rows.items())
+        )
+        if baseline and (baseline.get('vendor'), baseline.get('rows')) != (connection.vendor, rows):
+            self.stdout.write(self.style.WARNING(
+                'The baseline was recorded on {}: {}'.format(baseline.get('vendor'), baseline.get('rows'))
+            ))
+        if baseline:
+            self.stdout.write(
+                f'Changes from the baseline above {options["threshold"]:g}% are marked with ! (slower) '
+                f'or * (faster)'
+            )
+
+        results = {}
+        for list_name in options['lists']:
+            view_class, scenarios = SCENARIOS[list_name]
+            for scenario, params in scenarios.items():
+                name = f'{list_name}/{scenario}'
+                try:
+                    results[name] = self.measure(view_class, params, options['repeat'])
+                except Http404:
+                    self.stdout.write(f'{name:<20} skipped, not enough rows')
+                    continue
+                self.report(name, results[name], baseline.get('results', {}), options['threshold'])
+
+        if options['save']:
+            with open(options['save'], 'w') as baseline_file:
+                json.dump({'vendor': connection.vendor, 'rows': rows, 'results': results}, baseline_file, indent=2)
+            self.stdout.write(f'Baseline saved to {options["save"]}')
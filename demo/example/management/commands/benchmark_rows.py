@@ -0,0 +1,68 @@
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.template import engines
+from django.test import RequestFactory
+from django.utils import timezone
+
+from demo.example.models import Institution, Person
+from demo.example.views import FancyPersonList
+
+
+class BenchmarkPersonList(FancyPersonList):
+    list_columns = [
+        'id', 'first_name', 'last_name', 'age', 'type', 'institution', 'created', 'modified', 'bio',
+        'institution__name'
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the rendering of list rows and headers, without database access, through get_row, the row.html '
+        'template and the single-pass renderer used with fast_rows'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100, help='Number of rows per page')
+        parser.add_argument('--repeat', type=int, default=200, help='Number of pages to render')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        institution = Institution(pk=1, name='University of Somewhere', city='Somewhere', country='Nowhere')
+        objects = []
+        for i in range(options['rows']):
+            obj = Person(
+                pk=i + 1, first_name=f'First{i}', last_name=f'Last{i}', age=20 + i % 50, bio='Bio ' * 20,
+                type=Person.Type.values[i % 3], institution=institution, created=now, modified=now,
+            )
+            obj._column_9 = institution.name
+            objects.append(obj)
+
+        request = RequestFactory().get('/')
+        view = BenchmarkPersonList()
+        view.setup(request)
+
+        rows_template = engines['django'].from_string(
+            '{% load itemlist %}{% for obj in object_list %}{% show_row obj %}{% endfor %}'
+        )
+
+        def render_page():
+            list(view.get_headers())
+            for obj in objects:
+                for cell in view.get_row(obj):
+                    str(cell['text'])
+
+        def render_template():
+            rows_template.render({'view': view, 'object_list': objects})
+
+        def render_fast():
+            view.render_rows(objects)
+
+        for name, render in (('get_row', render_page), ('row.html', render_template), ('fast_rows', render_fast)):
+            render()
+            total = timeit.timeit(render, number=options['repeat'])
+            per_page = total / options['repeat']
+            self.stdout.write(
+                f'{name:>10}: {options["rows"]} rows x {len(view.get_list_columns())} columns: '
+                f'{per_page * 1e3:.3f} ms/page, {per_page * 1e6 / options["rows"]:.1f} us/row'
+            )
@@ -0,0 +1,88 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory, override_settings
+
+from demo.example.models import Institution, Person
+from demo.example.views import FancyPersonList
+from itemlist.search import create_fts_index, get_fts_dependencies, get_fts_indexes, get_fts_table, set_table_exists
+
+VIEW_PATH = 'demo.example.views.FancyPersonList'
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the icontains and FTS5 search of the person list on SQLite. Synthetic people are added to reach '
+        'the requested number of rows, all changes are rolled back at the end.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000, help='Number of people to search')
+        parser.add_argument('--repeat', type=int, default=5, help='Number of searches per term')
+        parser.add_argument('terms', nargs='*', default=['john', 'smith university', 'physics'])
+
+    def clear_caches(self):
+        get_fts_indexes.cache_clear()
+        get_fts_dependencies.cache_clear()
+        # the index is rolled back with the synthetic people, forget that it exists
+        set_table_exists(connection.alias, get_fts_table(Person, FancyPersonList().get_list_search()), None)
+
+    def add_people(self, rows):
+        people = list(Person.objects.values_list('first_name', 'last_name', 'bio', 'type'))
+        institutions = list(Institution.objects.values_list('pk', flat=True))
+        if not people or not institutions:
+            raise CommandError('The database must contain people and institutions to generate from')
+        rng = random.Random(0)
+        words = ' '.join(bio for _, _, bio, _ in people).split()
+        missing = rows - len(people)
+        while missing > 0:
+            batch = min(missing, 10000)
+            Person.objects.bulk_create([
+                Person(
+                    first_name=rng.choice(people)[0], last_name=rng.choice(people)[1], age=rng.randint(18, 90),
+                    bio=' '.join(rng.choices(words, k=20)), type=rng.choice(people)[3],
+                    institution_id=rng.choice(institutions),
+                ) for _ in range(batch)
+            ])
+            missing -= batch
+            self.stdout.write(f'\r{rows - missing} people', ending='')
+        self.stdout.write('')
+
+    def time_search(self, term, repeat):
+        view = FancyPersonList()
+        view.setup(RequestFactory().get('/'))
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            queryset, use_distinct = view.get_search_results(Person.objects.all(), term)
+            if use_distinct:
+                queryset = queryset.distinct()
+            count = queryset.count()
+            timings.append(time.perf_counter() - start)
+        return count, min(timings)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('This benchmark requires a SQLite database')
+        with transaction.atomic():
+            self.add_people(options['rows'])
+            search_fields = FancyPersonList().get_list_search()
+            start = time.perf_counter()
+            create_fts_index(Person, search_fields, connection.alias)
+            self.stdout.write(f'FTS5 index built in {time.perf_counter() - start:.2f} s')
+
+            for term in options['terms']:
+                results = {}
+                for mode, views in (('icontains', []), ('fts5', [VIEW_PATH])):
+                    with override_settings(ITEMLIST_SEARCH_INDEXES=views):
+                        self.clear_caches()
+                        results[mode] = self.time_search(term, options['repeat'])
+                self.stdout.write(
+                    f'"{term}": icontains {results["icontains"][1] * 1e3:.1f} ms ({results["icontains"][0]} rows), '
+                    f'fts5 {results["fts5"][1] * 1e3:.1f} ms ({results["fts5"][0]} rows), '
+                    f'speedup {results["icontains"][1] / results["fts5"][1]:.1f}x'
+                )
+            transaction.set_rollback(True)
+        self.clear_caches()
@@ -0,0 +1,153 @@
+import datetime
+import random
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from demo.example.models import Institution, Person, Subject
+from itemlist.cache import bump_model_version
+
+FIRST_NAMES = [
+    'John', 'Mary', 'James', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda', 'David', 'Elizabeth', 'Ahmed',
+    'Fatima', 'Wei', 'Mei', 'Carlos', 'Lucia', 'Olumide', 'Ngozi', 'Ivan', 'Olga', 'Hiroshi', 'Yuki', 'Pierre',
+    'Amelie', 'Ravi', 'Priya',
+]
+LAST_NAMES = [
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Martinez', 'Wilson', 'Chen',
+    'Wang', 'Okafor', 'Adeyemi', 'Ivanov', 'Petrova', 'Tanaka', 'Sato', 'Dubois', 'Martin', 'Patel', 'Sharma',
+    'Nguyen', 'Kim', 'Silva', 'Santos',
+]
+CITIES = [
+    ('Saskatoon', 'Canada'), ('Toronto', 'Canada'), ('Lagos', 'Nigeria'), ('Zaria', 'Nigeria'), ('Lyon', 'France'),
+    ('Paris', 'France'), ('Osaka', 'Japan'), ('Tokyo', 'Japan'), ('Pune', 'India'), ('Delhi', 'India'),
+    ('Porto', 'Portugal'), ('Lisbon', 'Portugal'), ('Austin', 'United States'), ('Boston', 'United States'),
+]
+KINDS = ['University', 'Institute', 'College', 'Laboratory', 'Centre', 'Academy']
+SUBJECTS = [
+    'Physics', 'Chemistry', 'Biology', 'Mathematics', 'Geology', 'Astronomy', 'Medicine', 'Engineering',
+    'Economics', 'History', 'Linguistics', 'Philosophy', 'Computing', 'Statistics', 'Ecology', 'Crystallography',
+]
+WORDS = (
+    'research teaching structure synchrotron protein crystal beamline sample analysis energy material surface '
+    'diffraction spectroscopy imaging student professor scientist project program grant collaboration data model '
+    'theory experiment measurement instrument facility publication review field laboratory method'
+).split()
+
+
+@contextmanager
+def explicit_dates(*models):
+    """
+    Allow setting the `auto_now_add` and `auto_now` fields of the models explicitly while the block runs
+    """
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False) or getattr(field, 'auto_now', False)
+    ]
+    flags = [(field, field.auto_now_add, field.auto_now) for field in fields]
+    for field in fields:
+        field.auto_now_add = field.auto_now = False
+    try:
+        yield
+    finally:
+        for field, auto_now_add, auto_now in flags:
+            field.auto_now_add, field.auto_now = auto_now_add, auto_now
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk-create synthetic subjects, institutions, institution subjects and people for benchmarking. The rows '
+        'are added to the existing data, in batches, with creation dates spread over the last years. Search indexes '
+        'must be rebuilt afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--people', type=int, default=1000000, help='Number of people to create')
+        parser.add_argument('--institutions', type=int, default=10000, help='Number of institutions to create')
+        parser.add_argument('--subjects', type=int, default=200, help='Number of subjects to create')
+        parser.add_argument(
+            '--subjects-per-institution', type=int, default=5, help='Maximum number of subjects of an institution'
+        )
+        parser.add_argument('--years', type=int, default=10, help='Number of years over which rows were created')
+        parser.add_argument('--batch-size', type=int, default=10000, help='Number of rows created per query')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the random generator')
+
+    def get_date(self):
+        return self.now - datetime.timedelta(seconds=self.rng.randrange(self.period))
+
+    def get_text(self, words):
+        return ' '.join(self.rng.choices(WORDS, k=words))
+
+    def create(self, model, total, build, batch_size):
+        """
+        Create `total` instances of the model built by `build(index)` in batches, each in its own transaction
+        :return: list of primary keys of the created instances
+        """
+        pks = []
+        for start in range(0, total, batch_size):
+            with transaction.atomic():
+                objects = model.objects.bulk_create([build(i) for i in range(start, min(start + batch_size, total))])
+            pks.extend(obj.pk for obj in objects)
+            self.stdout.write(f'\r{model._meta.verbose_name_plural}: {start + len(objects)}', ending='')
+        self.stdout.write('')
+        return pks
+
+    def handle(self, *args, **options):
+        if not connection.features.can_return_rows_from_bulk_insert:
+            raise CommandError('The database must return the primary keys of bulk inserted rows')
+        self.rng = random.Random(options['seed'])
+        self.now = timezone.now()
+        self.period = max(options['years'], 1) * 365 * 24 * 3600
+        batch_size = options['batch_size']
+        offset = Institution.objects.count()
+
+        with explicit_dates(Person, Institution):
+            subjects = self.create(Subject, options['subjects'], lambda i: Subject(
+                name=f'{self.rng.choice(SUBJECTS)} {self.rng.choice(WORDS).title()}',
+                description=self.get_text(30),
+            ), batch_size)
+
+            def build_institution(i):
+                city, country = self.rng.choice(CITIES)
+                created = self.get_date()
+                return Institution(
+                    name=f'{city} {self.rng.choice(KINDS)} of {self.rng.choice(SUBJECTS)} {offset + i + 1}',
+                    city=city, country=country, created=created, modified=created,
+                )
+            institutions = self.create(Institution, options['institutions'], build_institution, batch_size)
+
+            def build_person(i):
+                created = self.get_date()
+                return Person(
+                    first_name=self.rng.choice(FIRST_NAMES), last_name=self.rng.choice(LAST_NAMES),
+                    age=self.rng.randint(18, 90), bio=self.get_text(20), type=self.rng.choice(Person.Type.values),
+                    institution_id=self.rng.choice(institutions), created=created, modified=created,
+                )
+            if institutions:
+                self.create(Person, options['people'], build_person, batch_size)
+
+        # one institution in ten belongs to a parent institution
+        children = [
+            Institution(pk=pk, parent_id=institutions[self.rng.randrange(i)])
+            for i, pk in enumerate(institutions) if i and self.rng.random() < 0.1
+        ]
+        for start in range(0, len(children), batch_size):
+            with transaction.atomic():
+                Institution.objects.bulk_update(children[start:start + batch_size], ['parent'])
+
+        Link = Institution.subjects.through
+        links = []
+        for pk in institutions:
+            count = self.rng.randint(0, min(options['subjects_per_institution'], len(subjects)))
+            links.extend(
+                Link(institution_id=pk, subject_id=subject) for subject in self.rng.sample(subjects, count)
+            )
+        for start in range(0, len(links), batch_size):
+            with transaction.atomic():
+                Link.objects.bulk_create(links[start:start + batch_size])
+        self.stdout.write(f'{len(children)} parent institutions and {len(links)} institution subjects set')
+
+        # bulk operations do not send the signals which invalidate the cached filter choices and responses
+        for model in (Subject, Institution, Person, Link):
+            bump_model_version(model)
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils.html import format_html
 from django.utils.text import gettext_lazy as _
 
 
@@ -57,3 +58,6 @@ class Person(models.Model):
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
+
+    def type_badge(self):
+        return format_html('<span class="badge text-bg-secondary">{}</span>', self.get_type_display())
@@ -0,0 +1,211 @@
+from unittest import skipUnless
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.models import Count, Q
+from django.test import RequestFactory, TestCase, override_settings
+
+from demo.example.models import Institution, Person, Subject
+from demo.example.views import FancyInstitutionList, FancyPersonList
+from itemlist.cache import connect_signals, get_configured_models
+from itemlist.search import TrigramSearch
+from itemlist.snapshots import create_snapshot, drop_snapshot, get_snapshot_status
+
+
+class FilteredInstitutionList(FancyInstitutionList):
+    list_filters = ['parent', 'subjects', 'people__type']
+    cache_filters = False
+
+
+class BadgePersonList(FancyPersonList):
+    list_columns = ['first_name', 'last_name', 'type_badge', 'institution']
+    cache_filters = False
+
+
+class SnapshotInstitutionList(FancyInstitutionList):
+    list_columns = ['name', ('num_people', Count('people'))]
+    list_filters = []
+    cache_filters = False
+    materialized = True
+
+
+class FilterQuerysetTests(TestCase):
+    """
+    Filters spanning multi-valued relations are applied as EXISTS subqueries, they must match the same rows as
+    the joins made distinct they replace.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        physics, chemistry, biology = [
+            Subject.objects.create(name=name, description=f'{name} courses')
+            for name in ('Physics', 'Chemistry', 'Biology')
+        ]
+        institutions = [
+            Institution.objects.create(name=name, city=city, country='Canada')
+            for name, city in (
+                ('University of Toronto', 'Toronto'), ('McGill University', 'Montreal'),
+                ('Dawson College', 'Montreal'), ('University of Saskatchewan', 'Saskatoon'),
+            )
+        ]
+        toronto, mcgill, dawson, saskatchewan = institutions
+        toronto.subjects.set([physics, chemistry, biology])
+        mcgill.subjects.set([physics, chemistry])
+        dawson.subjects.set([biology])
+        dawson.parent = mcgill
+        dawson.save()
+        for institution, types in (
+            (toronto, ['admin', 'admin', 'user']), (mcgill, ['user', 'user']), (dawson, ['admin', 'guest']),
+        ):
+            for i, person_type in enumerate(types):
+                Person.objects.create(
+                    first_name=f'Person {i}', last_name=institution.name, age=30 + i, bio='', type=person_type,
+                    institution=institution,
+                )
+        cls.physics, cls.biology = physics, biology
+
+    def get_list_pks(self, params):
+        view = FilteredInstitutionList()
+        view.setup(RequestFactory().get('/', params))
+        return sorted(view.get_queryset().values_list('pk', flat=True))
+
+    def get_distinct_pks(self, lookups, search=None):
+        queryset = Institution.objects.filter(**lookups)
+        if search:
+            queryset = queryset.filter(
+                Q(name__icontains=search) | Q(city__icontains=search) | Q(country__icontains=search) |
+                Q(parent__name__icontains=search) | Q(subjects__name__icontains=search)
+            )
+        return sorted(queryset.distinct().values_list('pk', flat=True))
+
+    def assertSameRows(self, params, lookups):
+        for search in (None, 'university', 'biology'):
+            with self.subTest(params=params, search=search):
+                list_params = dict(params, search=search) if search else params
+                expected = self.get_distinct_pks(lookups, search)
+                self.assertEqual(self.get_list_pks(list_params), expected)
+
+    def test_many_to_many_filter(self):
+        for subject in (self.physics, self.biology):
+            self.assertSameRows({'subjects__id__exact': subject.pk}, {'subjects__id__exact': subject.pk})
+
+    def test_reverse_foreign_key_filter(self):
+        for person_type in ('admin', 'user', 'guest'):
+            self.assertSameRows({'people__type__exact': person_type}, {'people__type__exact': person_type})
+
+    def test_combined_filters(self):
+        self.assertSameRows(
+            {'subjects__id__exact': self.biology.pk, 'people__type__exact': 'admin'},
+            {'subjects__id__exact': self.biology.pk, 'people__type__exact': 'admin'},
+        )
+
+    def test_unfiltered(self):
+        self.assertSameRows({}, {})
+
+
+class FastRowsTests(TestCase):
+    """
+    Rows rendered in a single pass with `fast_rows` must match the rows rendered by the template
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        institution = Institution.objects.create(name='Smith & Sons <Institute>', city='Ottawa', country='Canada')
+        for first_name, last_name, person_type in (
+            ('Jean', "O'Brien", 'admin'), ('<b>Ann</b>', 'Lee & Park', 'user'), ('Tom', '"Quoted"', 'guest'),
+        ):
+            Person.objects.create(
+                first_name=first_name, last_name=last_name, age=40, bio='', type=person_type, institution=institution
+            )
+
+    def render(self, fast_rows):
+        view = BadgePersonList.as_view(fast_rows=fast_rows)
+        return view(RequestFactory().get('/')).render().content.decode()
+
+    def test_safe_column(self):
+        content = self.render(fast_rows=True)
+        self.assertEqual(content, self.render(fast_rows=False))
+        self.assertIn('<span class="badge text-bg-secondary">Administrator</span>', content)
+        self.assertIn('&lt;b&gt;Ann&lt;/b&gt;', content)
+        self.assertIn('Smith &amp; Sons &lt;Institute&gt;', content)
+
+
+class TrigramRankTests(TestCase):
+    """
+    Ranking by trigram similarity must not repeat the results matching several values of multi-valued fields
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        subjects = [
+            Subject.objects.create(name=name, description='') for name in ('Physics', 'Physiology', 'Physical Arts')
+        ]
+        institution = Institution.objects.create(name='Physics Institute', city='Ottawa', country='Canada')
+        institution.subjects.set(subjects)
+        Institution.objects.create(name='Law School', city='Ottawa', country='Canada')
+
+    def test_multi_valued_similarity_is_correlated(self):
+        queryset = Institution.objects.all()
+        rank = TrigramSearch(similarity=True).get_similarity(queryset, 'subjects__name', 'physics')
+        ranked = queryset.annotate(rank=rank)
+        self.assertEqual(list(ranked.query.alias_map), [Institution._meta.db_table])
+
+    @skipUnless(connection.vendor == 'postgresql', 'trigram similarity requires PostgreSQL')
+    def test_multi_valued_search(self):
+        queryset, use_distinct = TrigramSearch(similarity=True).search(
+            Institution.objects.all(), ['name', 'subjects__name'], 'physics'
+        )
+        pks = list(queryset.values_list('pk', flat=True))
+        self.assertFalse(use_distinct)
+        self.assertEqual(len(pks), len(set(pks)))
+
+
+@override_settings(ITEMLIST_SNAPSHOTS=['demo.example.tests.SnapshotInstitutionList'])
+class SnapshotTests(TestCase):
+    """
+    Lists served from a snapshot must report it stale after their models change, and still list the rows added
+    since it was refreshed
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.institution = Institution.objects.create(name='Carleton University', city='Ottawa', country='Canada')
+        cls.person = Person.objects.create(
+            first_name='Ann', last_name='Lee', age=40, bio='', type='user', institution=cls.institution
+        )
+
+    def setUp(self):
+        get_configured_models.cache_clear()
+        self.addCleanup(get_configured_models.cache_clear)
+        connect_signals()
+        self.view = SnapshotInstitutionList()
+        self.view.setup(RequestFactory().get('/'))
+        create_snapshot(self.view, connection.alias)
+        self.addCleanup(drop_snapshot, self.view, connection.alias)
+
+    def get_rows(self):
+        return {row.pk: row.num_people for row in self.view.get_queryset()}
+
+    def test_stale_after_related_change(self):
+        self.view.get_queryset()
+        table = self.view.snapshot_table
+        self.assertIsNotNone(table)
+        self.assertFalse(get_snapshot_status(self.view, connection.alias, table)['stale'])
+        Person.objects.create(
+            first_name='Tom', last_name='Park', age=30, bio='', type='admin', institution=self.institution
+        )
+        self.assertTrue(get_snapshot_status(self.view, connection.alias, table)['stale'])
+        self.assertEqual(self.get_rows(), {self.institution.pk: 1})
+
+    def test_rows_added_since_refresh(self):
+        added = Institution.objects.create(name='Algonquin College', city='Ottawa', country='Canada')
+        self.assertEqual(self.get_rows(), {self.institution.pk: 1, added.pk: None})
+
+    def test_view_not_listed(self):
+        with override_settings(ITEMLIST_SNAPSHOTS=[]):
+            get_configured_models.cache_clear()
+            with self.assertRaises(ImproperlyConfigured):
+                self.view.get_queryset()
@@ -29,6 +29,8 @@ class FancyPersonList(ItemListView):
     list_title = 'Fancy People'
     link_url = 'person-edit'
     link_attr = 'data-modal-url'
+    project_columns = True
+    cache_filters = True
     paginate_by = 15
 
 
@@ -48,6 +50,8 @@ class FancyInstitutionList(ItemListView):
     link_url = 'institution-edit'
     link_attr = 'data-modal-url'
     link_field = 'name'
+    project_columns = True
+    cache_filters = True
     paginate_by = 15
 
 
@@ -3,3 +3,11 @@ from django.apps import AppConfig
 
 class ItemListConfig(AppConfig):
     name = 'itemlist'
+
+    def ready(self):
+        from django.conf import settings
+        from .cache import connect_signals
+        from .search import connect_fts_signals
+        if getattr(settings, 'ITEMLIST_CACHED_VIEWS', None) or getattr(settings, 'ITEMLIST_SNAPSHOTS', None):
+            connect_signals()
+        connect_fts_signals()
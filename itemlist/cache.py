@@ -0,0 +1,196 @@
+import hashlib
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib import admin
+from django.core.cache import caches
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils import translation
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from django.utils.module_loading import import_string
+
+VERSION_PREFIX = 'itemlist:version'
+CHOICES_PREFIX = 'itemlist:choices'
+RESPONSE_PREFIX = 'itemlist:response'
+
+
+def get_cache():
+    """
+    Return the cache used by itemlist, selected through the `ITEMLIST_CACHE` setting. Default is 'default'.
+    """
+    return caches[getattr(settings, 'ITEMLIST_CACHE', 'default')]
+
+
+def make_key(prefix, *parts):
+    digest = hashlib.md5(':'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return f'{prefix}:{digest}'
+
+
+def get_version_key(model):
+    return f'{VERSION_PREFIX}:{model._meta.concrete_model._meta.label_lower}'
+
+
+def get_model_versions(*models):
+    """
+    Return a string combining the current versions of the given models. The version of a model changes every
+    time one of its instances is saved or deleted.
+    :param models: model classes
+    :return: str
+    """
+    cache = get_cache()
+    keys = [get_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            versions[key] = time.time_ns()
+            cache.add(key, versions[key], None)
+    return '.'.join(str(versions[key]) for key in keys)
+
+
+def bump_model_version(model, version=None):
+    get_cache().set(get_version_key(model), time.time_ns() if version is None else version, None)
+
+
+# models whose changes are tracked because a view caching their data was used in this process
+tracked_models = set()
+
+
+def get_related_models(models):
+    """
+    Add the intermediate models of the many-to-many relations of the models, whose changes are sent by
+    `m2m_changed` with the intermediate model as sender
+    """
+    related = set()
+    for model in models:
+        model = model._meta.concrete_model
+        related.add(model)
+        for field in model._meta.get_fields():
+            if field.many_to_many:
+                through = field.remote_field.through if field.concrete else field.through
+                if not isinstance(through, str):
+                    related.add(through)
+    return related
+
+
+@lru_cache(maxsize=None)
+def get_configured_models():
+    """
+    Return the models whose changes are tracked for the views listed in the `ITEMLIST_CACHED_VIEWS` and
+    `ITEMLIST_SNAPSHOTS` settings, the models returned by their `get_cache_models()`
+    """
+    models = set()
+    for path in [*getattr(settings, 'ITEMLIST_CACHED_VIEWS', []), *getattr(settings, 'ITEMLIST_SNAPSHOTS', [])]:
+        models.update(import_string(path)().get_cache_models())
+    return frozenset(get_related_models(models))
+
+
+def track_models(*models):
+    """
+    Track the changes of the models from now on in this process, to invalidate the data cached from them
+    """
+    models = set(models) - tracked_models
+    if models:
+        tracked_models.update(get_related_models(models))
+        connect_signals()
+
+
+def is_tracked(model):
+    model = model._meta.concrete_model
+    return model in tracked_models or model in get_configured_models()
+
+
+def model_changed(sender, **kwargs):
+    if is_tracked(sender):
+        bump_model_version(sender)
+
+
+def relation_changed(sender, instance, action, model, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        for changed in {sender, type(instance), model}:
+            if is_tracked(changed):
+                bump_model_version(changed)
+
+
+def connect_signals():
+    post_save.connect(model_changed, dispatch_uid='itemlist_model_saved')
+    post_delete.connect(model_changed, dispatch_uid='itemlist_model_deleted')
+    m2m_changed.connect(relation_changed, dispatch_uid='itemlist_relation_changed')
+
+
+@lru_cache(maxsize=None)
+def get_model_admin(model):
+    """
+    Return a ModelAdmin for the model, shared by all list filters of the model within the process.
+    """
+    return admin.ModelAdmin(model, admin.site)
+
+
+def get_cached_choices(key, sources, timeout, compute):
+    """
+    Return the choices computed by `compute` from the cache, invalidated when any of the source models change.
+    :param key: cache key identifying the filter
+    :param sources: models the choices are computed from
+    :param timeout: cache timeout in seconds
+    :param compute: callable returning a list of choices if they are not cached
+    :return: list
+    """
+    cache = get_cache()
+    full_key = make_key(CHOICES_PREFIX, key, get_model_versions(*sources), translation.get_language())
+    choices = cache.get(full_key)
+    if choices is None:
+        choices = compute()
+        cache.set(full_key, choices, timeout)
+    return choices
+
+
+def _force_labels(choices):
+    return [(value, force_str(label) if isinstance(label, Promise) else label) for value, label in choices]
+
+
+class CachedChoicesMixin:
+    """
+    Mixin for list filters which caches the choices looked up from the database.
+    """
+    choices_cache_key = None
+    choices_cache_sources = ()
+    choices_cache_timeout = 300
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if isinstance(getattr(self, 'lookup_choices', None), QuerySet):
+            queryset = self.lookup_choices
+            self.lookup_choices = self.get_cached_choices(lambda: list(queryset))
+
+    def get_cached_choices(self, compute):
+        return get_cached_choices(
+            self.choices_cache_key, self.choices_cache_sources, self.choices_cache_timeout, compute
+        )
+
+    def lookups(self, request, model_admin):
+        lookups = super().lookups
+        return self.get_cached_choices(lambda: _force_labels(lookups(request, model_admin) or ()))
+
+    def field_choices(self, field, request, model_admin):
+        field_choices = super().field_choices
+        return self.get_cached_choices(lambda: _force_labels(field_choices(field, request, model_admin)))
+
+
+@lru_cache(maxsize=None)
+def get_cached_filter_class(filter_class, key, sources, timeout):
+    """
+    Create a subclass of the list filter class which caches its choices
+    :param filter_class: SimpleListFilter or FieldListFilter subclass
+    :param key: cache key identifying the filter
+    :param sources: tuple of models the choices are computed from
+    :param timeout: cache timeout in seconds
+    :return: list filter class
+    """
+    return type(filter_class.__name__, (CachedChoicesMixin, filter_class), {
+        '__module__': filter_class.__module__,
+        'choices_cache_key': key,
+        'choices_cache_sources': sources,
+        'choices_cache_timeout': timeout,
+    })
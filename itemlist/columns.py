@@ -0,0 +1,366 @@
+from datetime import date, datetime, time
+from functools import lru_cache
+
+from django.contrib.admin.utils import NotRelationField, get_fields_from_path
+from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist
+from django.db import models
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.encoding import force_str
+from django.utils.hashable import make_hashable
+
+
+def format_value(value):
+    """
+    Convert a column value to text for display
+    :param value: the value
+    :return: str
+    """
+    if isinstance(value, datetime):
+        return timezone.localtime(value).strftime('%c')
+    elif isinstance(value, time):
+        return value.strftime('%X')
+    elif isinstance(value, date):
+        return value.strftime('%Y-%m-%d')
+    elif value is None:
+        return ''
+    else:
+        return str(value)
+
+
+def format_datetime(value):
+    return '' if value is None else timezone.localtime(value).strftime('%c')
+
+
+def format_date(value):
+    return '' if value is None else value.strftime('%Y-%m-%d')
+
+
+def format_time(value):
+    return '' if value is None else value.strftime('%X')
+
+
+def format_text(value):
+    return '' if value is None else str(value)
+
+
+def format_values(values):
+    return ', '.join(format_value(value) for value in values)
+
+
+ANNOTATE = 'annotate'
+SELECT = 'select'
+PREFETCH = 'prefetch'
+EXPRESSION = 'expression'
+
+
+def split_column(column):
+    """
+    Split an entry of `list_columns` into its name and expression
+    :param column: column name, or tuple (name, expression) for a column computed by the database
+    :return: tuple (name, expression), expression is None for named columns
+    """
+    if isinstance(column, (tuple, list)):
+        return column[0], column[1]
+    return column, None
+
+
+def get_column_name(column):
+    return split_column(column)[0]
+
+
+def get_expression_paths(expression):
+    """
+    Return the field paths referenced by an expression
+    """
+    return [node.name for node in expression.flatten() if isinstance(node, models.F)]
+
+
+def contains_aggregate(expression):
+    """
+    Whether an unresolved expression contains an aggregate of the list query, excluding subqueries
+    """
+    return any(isinstance(node, models.Aggregate) for node in expression.flatten())
+
+
+def as_subquery(model, expression):
+    """
+    Turn an aggregate over a reverse or many-to-many relation, such as `Count('people')`, into a correlated
+    subquery, so that joins added by other columns, filters or searches do not multiply the rows aggregated and
+    the list query needs no GROUP BY. Other expressions, and aggregates with a filter, are returned unchanged.
+    :param model: the model of the list
+    :param expression: the column expression
+    :return: expression
+    """
+    if not isinstance(expression, models.Aggregate) or getattr(expression, 'filter', None) is not None:
+        return expression
+    sources = expression.get_source_expressions()
+    if not sources or not isinstance(sources[0], models.F):
+        return expression
+    name, _, rest = sources[0].name.partition('__')
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return expression
+    if isinstance(field, models.ManyToManyField):
+        back = field.related_query_name()
+    elif isinstance(field, models.ForeignObjectRel) and (field.one_to_many or field.many_to_many):
+        back = field.field.name
+    else:
+        return expression
+
+    aggregate = expression.copy()
+    sources[0] = models.F(rest or 'pk')
+    aggregate.set_source_expressions(sources)
+    related = field.related_model._base_manager.filter(**{back: models.OuterRef('pk')}).order_by()
+    subquery = models.Subquery(related.values(back).annotate(value=aggregate).values('value'))
+    # the subquery returns no row instead of the value of the aggregate on an empty set
+    default = getattr(expression, 'default', None)
+    if default is None:
+        default = expression.empty_result_set_value
+    if default is not None:
+        return Coalesce(subquery, default if hasattr(default, 'resolve_expression') else models.Value(default))
+    return subquery
+
+
+def plan_column_path(model, name):
+    """
+    Choose how to fetch a column spanning relations. Paths following forward single-valued relations to a value are
+    annotated, sharing their joins with the other annotations. Paths ending on a related object are loaded with
+    `select_related()`. Paths crossing reverse or many-to-many relations select their leading single-valued
+    relations and prefetch the rest.
+    :param model: the model of the list
+    :param name: double-underscore column path
+    :return: tuple (fetch, select, prefetch) where fetch is one of ANNOTATE, SELECT and PREFETCH, select the path
+        for `select_related()` and prefetch the lookup for `prefetch_related()`, or None
+    """
+    try:
+        fields = get_fields_from_path(model, name)
+    except (FieldDoesNotExist, NotRelationField):
+        return ANNOTATE, None, None
+    names = name.split('__')
+    multiple = [i for i, field in enumerate(fields) if field.many_to_many or field.one_to_many]
+    if multiple:
+        last = max(i for i, field in enumerate(fields) if field.is_relation)
+        select = '__'.join(names[:multiple[0]]) or None
+        return PREFETCH, select, '__'.join(names[:last + 1])
+    elif fields[-1].is_relation:
+        return SELECT, name, None
+    return ANNOTATE, None, None
+
+
+def follow_path(obj, names):
+    """
+    Follow a path of single-valued relations from an object
+    :param obj: the object
+    :param names: attribute names along the path
+    :return: the value at the end of the path, or None if a related object is missing
+    """
+    for name in names:
+        try:
+            obj = getattr(obj, name)
+        except ObjectDoesNotExist:
+            return None
+        if obj is None:
+            return None
+    return obj
+
+
+def collect_path(obj, names):
+    """
+    Follow a path crossing multi-valued relations from an object, using the prefetched related objects
+    :param obj: the object
+    :param names: attribute names along the path
+    :return: list of the values at the end of the path
+    """
+    values = [obj]
+    for name in names:
+        found = []
+        for value in values:
+            try:
+                value = getattr(value, name)
+            except ObjectDoesNotExist:
+                continue
+            if isinstance(value, models.Manager):
+                found.extend(value.all())
+            elif value is not None:
+                found.append(value)
+        values = found
+    return values
+
+
+def column_is_field(model, name):
+    try:
+        model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+def get_column_title(model, name):
+    opts = model._meta
+    if '__' not in name:
+        if column_is_field(model, name):
+            field = opts.get_field(name)
+            try:
+                return field.verbose_name.title()
+            except AttributeError:
+                return name.replace('_', ' ').title()
+        else:
+            attr = getattr(model, name, '')
+            try:
+                header = attr.short_description
+            except AttributeError:
+                header = name.replace('_', ' ')
+            return header.title()
+    else:
+        this, rest = name.split('__', 1)
+        field = opts.get_field(this)
+        try:
+            return field.verbose_name.title() + ' / ' + get_column_title(field.related_model(), rest)
+        except AttributeError:
+            return field.name.replace('_', ' ').title() + ' / ' + get_column_title(field.related_model(), rest)
+
+
+def get_column_option(model, name, option, default=None):
+    """
+    Read an option such as `sort_field` or `requires` declared on a method or property column
+    :param model: the model of the list
+    :param name: column name
+    :param option: name of the option attribute
+    :param default: value returned if the option is not declared
+    """
+    attr = getattr(model, name, None)
+    for target in (attr, getattr(attr, 'fget', None), getattr(attr, 'func', None)):
+        if target is not None and hasattr(target, option):
+            return getattr(target, option)
+    return default
+
+
+def get_column_attr(index, name):
+    """
+    Name of the attribute holding the value of a column on the list objects. Columns spanning relations
+    are annotated onto the queryset.
+    """
+    return '_column_{}'.format(index) if '__' in name else name
+
+
+class Column:
+    """
+    Immutable description of a list column, resolved once for a view configuration and model.
+    """
+    __slots__ = (
+        'name', 'index', 'attr', 'field', 'formatter', 'choices', 'transform', 'style', 'is_link', 'title', 'fetch',
+        'select', 'prefetch', 'expression', 'path',
+    )
+
+    def __init__(
+        self, name, index, attr, field, formatter, choices, transform, style, is_link, title, fetch=None,
+        select=None, prefetch=None, expression=None,
+    ):
+        path = tuple(name.split('__')) if fetch in (SELECT, PREFETCH) else None
+        for slot, value in zip(self.__slots__, (
+            name, index, attr, field, formatter, choices, transform, style, is_link, title, fetch, select, prefetch,
+            expression, path,
+        )):
+            object.__setattr__(self, slot, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"'{self.__class__.__name__}' object is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"'{self.__class__.__name__}' object is immutable")
+
+    def __repr__(self):
+        return f'<Column {self.index}: {self.name}>'
+
+    def get_value(self, obj):
+        """
+        Extract the raw value of the column from a list object
+        :param obj: the row item
+        :return: the value, the result of calling it for methods
+        """
+        if self.fetch == SELECT:
+            return follow_path(obj, self.path)
+        elif self.fetch == PREFETCH:
+            return collect_path(obj, self.path)
+        value = getattr(obj, self.attr, '')
+        if self.field is None and callable(value):
+            value = value()
+        return value
+
+    def get_text(self, value):
+        """
+        Format a raw value of the column for display, choices are replaced by their display value
+        :param value: the raw value
+        :return: str
+        """
+        if self.choices is not None:
+            return force_str(self.choices.get(make_hashable(value), value))
+        return self.formatter(value)
+
+
+def get_formatter(field):
+    if isinstance(field, models.DateTimeField):
+        return format_datetime
+    elif isinstance(field, models.DateField):
+        return format_date
+    elif isinstance(field, models.TimeField):
+        return format_time
+    elif field is not None:
+        return format_text
+    return format_value
+
+
+@lru_cache(maxsize=512)
+def compile_column_plan(model, columns, headers, transforms, styles, link_field, language=None):
+    """
+    Compile the columns of a list into a tuple of Column descriptors. The arguments must be hashable, the
+    dictionaries of the view are passed as tuples of items.
+    :param model: the model of the list
+    :param columns: tuple of column names or (name, expression) tuples
+    :param headers: tuple of (name, header) items
+    :param transforms: tuple of (name, transform) items
+    :param styles: tuple of (name, style) items
+    :param link_field: name of the column to link
+    :param language: active language, titles are translated when compiled
+    :return: tuple of Column instances
+    """
+    headers, transforms, styles = dict(headers), dict(transforms), dict(styles)
+    plan = []
+    for i, (name, expression) in enumerate(map(split_column, columns)):
+        field = None
+        if expression is None:
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                # For non-field list_display values, the value is either a method or a property
+                pass
+        choices = None
+        if field is not None and field.choices:
+            choices = dict(make_hashable(field.flatchoices))
+        if expression is not None:
+            # computed by the database, annotated under the column name
+            fetch, select, prefetch = EXPRESSION, None, None
+            expression = as_subquery(model, expression)
+        elif '__' in name:
+            fetch, select, prefetch = plan_column_path(model, name)
+        else:
+            fetch, select, prefetch = None, None, None
+        plan.append(Column(
+            name=name,
+            index=i,
+            attr=name if expression is not None else get_column_attr(i, name),
+            field=field,
+            formatter=format_values if fetch == PREFETCH else get_formatter(field),
+            choices=choices,
+            transform=transforms.get(name),
+            style=styles.get(name, ''),
+            is_link=(name == link_field),
+            title=headers.get(name, get_column_title(model, name)),
+            fetch=fetch,
+            select=select,
+            prefetch=prefetch,
+            expression=expression,
+        ))
+    return tuple(plan)
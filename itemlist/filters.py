@@ -1,11 +1,17 @@
 import abc
 import calendar
 import datetime
+import operator
 from datetime import date
 from enum import IntEnum
+from functools import lru_cache, reduce
 from typing import Literal
 
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.utils import get_fields_from_path
+from django.db import models
+from django.db.models.functions import ExtractMonth, ExtractQuarter, ExtractYear
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
@@ -16,6 +22,91 @@ class DateLimit(IntEnum):
     BOTH = 0
 
 
+def get_year_range(model, field_name, reverse=False):
+    """
+    Years spanned by the values of a date or datetime field, determined from a single Min/Max aggregate
+    which can be answered from an index on the field instead of scanning the table for distinct years.
+    :param model: the model
+    :param field_name: name or path of the date field
+    :param reverse: if True, the years are returned in descending order
+    :return: range of years, empty if there are no values
+    """
+    bounds = model._default_manager.aggregate(first=models.Min(field_name), last=models.Max(field_name))
+    if bounds['first'] is None:
+        return range(0)
+    first, last = (
+        timezone.localtime(value) if isinstance(value, datetime.datetime) and timezone.is_aware(value) else value
+        for value in (bounds['first'], bounds['last'])
+    )
+    return range(last.year, first.year - 1, -1) if reverse else range(first.year, last.year + 1)
+
+
+def get_period_filter(model, field_name, months, years=None):
+    """
+    Build a filter matching the given months of every year as a union of ranges on the field, which can use
+    an index on the field unlike `__month` or `__quarter` lookups.
+    :param model: the model
+    :param field_name: name or path of the date field
+    :param months: tuple of consecutive month numbers
+    :param years: years to match, determined from the values of the field by default
+    :return: Q object or None if the field has no values
+    """
+    field = get_fields_from_path(model, field_name)[-1]
+    ranges = []
+    for year in (get_year_range(model, field_name) if years is None else years):
+        start = date(year, months[0], 1)
+        end = date(year + 1, 1, 1) if months[-1] == 12 else date(year, months[-1] + 1, 1)
+        if isinstance(field, models.DateTimeField):
+            start, end = (datetime.datetime.combine(day, datetime.time.min) for day in (start, end))
+            if settings.USE_TZ:
+                start, end = timezone.make_aware(start), timezone.make_aware(end)
+        ranges.append(models.Q(**{f'{field_name}__gte': start, f'{field_name}__lt': end}))
+    return reduce(operator.or_, ranges) if ranges else None
+
+
+def date_part_indexes(field_name='created', parts=('month', 'quarter'), prefix=''):
+    """
+    Functional indexes matching `__year`, `__month` and `__quarter` lookups on a date field, for use in the
+    `indexes` of a model Meta. Datetime fields are extracted in the current time zone, so the indexes are only
+    used when the time zone active at query time is the one active when the migration was created.
+    :param field_name: name of the date field
+    :param parts: date parts to index, any of 'year', 'month' and 'quarter'
+    :param prefix: prefix of the index names, which must be unique within the database
+    :return: list of Index instances
+    """
+    functions = {'year': ExtractYear, 'month': ExtractMonth, 'quarter': ExtractQuarter}
+    return [
+        models.Index(functions[part](field_name), name=f'{prefix}{field_name}_{part}_idx')
+        for part in parts
+    ]
+
+
+class FilterOnlyMixin:
+    """
+    Mixin for list filters which filter the list without looking up their choices, for responses which do not
+    display the filters. The filters are always applied, since whether they have output depends on the choices.
+    """
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def field_choices(self, field, request, model_admin):
+        return []
+
+    def has_output(self):
+        return True
+
+
+@lru_cache(maxsize=None)
+def get_filter_only_class(filter_class):
+    """
+    Create a subclass of the list filter class which does not look up its choices
+    :param filter_class: SimpleListFilter or FieldListFilter subclass
+    :return: list filter class
+    """
+    return type(filter_class.__name__, (FilterOnlyMixin, filter_class), {'__module__': filter_class.__module__})
+
+
 class FilterFactory(abc.ABC):
     @classmethod
     @abc.abstractmethod
@@ -42,10 +133,7 @@ class YearLimitFilterFactory(FilterFactory):
                 super().__init__(request, new_params, model, *args, **kwargs)
 
             def lookups(self, request, model_admin):
-                qs = self.model.objects.filter()
-                value_field = f'{field_name}__year'
-                choices = qs.values_list(value_field, flat=True).order_by(value_field).distinct()
-                return ((yr, f'{yr}') for yr in choices)
+                return ((yr, f'{yr}') for yr in get_year_range(self.model, field_name))
 
             def queryset(self, request, queryset):
                 try:
@@ -75,11 +163,7 @@ class YearFilterFactory(FilterFactory):
                 super().__init__(request, new_params, model, *args, **kwargs)
 
             def lookups(self, request, model_admin):
-                qs = self.model.objects.filter()
-                value_field = f'{field_name}__year'
-                order_field = value_field if not reverse else f'-{value_field}'
-                choices = qs.values_list(value_field, flat=True).order_by(order_field).distinct()
-                return ((yr, f'{yr}') for yr in choices)
+                return ((yr, f'{yr}') for yr in get_year_range(self.model, field_name, reverse=reverse))
 
             def queryset(self, request, queryset):
                 flt = {} if not self.value() else {f'{field_name}__year': self.value()}
@@ -90,42 +174,73 @@ class YearFilterFactory(FilterFactory):
 
 class MonthFilterFactory(FilterFactory):
     @classmethod
-    def new(cls, field_name='created'):
+    def new(cls, field_name='created', ranges=True):
         class MonthFilter(admin.SimpleListFilter):
             parameter_name = f'{field_name}_month'
             title = parameter_name.replace('_', ' ').title()
 
             def __init__(self, request, new_params, model, *args, **kwargs):
                 self.model = model
+                self.years = None
                 super().__init__(request, new_params, model, *args, **kwargs)
 
+            def get_years(self):
+                # determined once, facet counts filter the queryset for every choice
+                if self.years is None:
+                    self.years = get_year_range(self.model, field_name)
+                return self.years
+
             def lookups(self, request, model_admin):
                 return ((month, calendar.month_name[month]) for month in range(1, 13))
 
             def queryset(self, request, queryset):
-                flt = {} if not self.value() else {f'{field_name}__month': self.value()}
-                return queryset.filter(**flt)
+                try:
+                    month = int(self.value())
+                except (ValueError, TypeError):
+                    return queryset
+                if not 1 <= month <= 12:
+                    return queryset.none()
+                if not ranges:
+                    return queryset.filter(**{f'{field_name}__month': month})
+                flt = get_period_filter(self.model, field_name, (month,), self.get_years())
+                return queryset.none() if flt is None else queryset.filter(flt)
 
         return MonthFilter
 
 
 class QuarterFilterFactory(FilterFactory):
     @classmethod
-    def new(cls, field_name='created'):
+    def new(cls, field_name='created', ranges=True):
         class QuarterFilter(admin.SimpleListFilter):
             parameter_name = f'{field_name}_quarter'
             title = parameter_name.replace('_', ' ').title()
 
             def __init__(self, request, new_params, model, *args, **kwargs):
                 self.model = model
+                self.years = None
                 super().__init__(request, new_params, model, *args, **kwargs)
 
+            def get_years(self):
+                # determined once, facet counts filter the queryset for every choice
+                if self.years is None:
+                    self.years = get_year_range(self.model, field_name)
+                return self.years
+
             def lookups(self, request, model_admin):
                 return ((i + 1, f'Q{i + 1}') for i in range(4))
 
             def queryset(self, request, queryset):
-                flt = {} if not self.value() else {f'{field_name}__quarter': self.value()}
-                return queryset.filter(**flt)
+                try:
+                    quarter = int(self.value())
+                except (ValueError, TypeError):
+                    return queryset
+                if not 1 <= quarter <= 4:
+                    return queryset.none()
+                if not ranges:
+                    return queryset.filter(**{f'{field_name}__quarter': quarter})
+                months = tuple(range(quarter * 3 - 2, quarter * 3 + 1))
+                flt = get_period_filter(self.model, field_name, months, self.get_years())
+                return queryset.none() if flt is None else queryset.filter(flt)
 
         return QuarterFilter
 
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils.module_loading import import_string
+
+from itemlist.search import create_fts_index, drop_fts_index, get_fts_table, get_search_field_names
+
+
+class Command(BaseCommand):
+    help = (
+        'Build or drop the SQLite FTS5 search index of an ItemListView. Lists use the index once it exists, '
+        'if the view is listed in the ITEMLIST_SEARCH_INDEXES setting which keeps it up to date.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('views', nargs='+', help='Dotted paths of ItemListView subclasses')
+        parser.add_argument('--drop', action='store_true', help='Remove the indexes')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias to use')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if connections[using].vendor != 'sqlite':
+            raise CommandError('FTS5 search indexes require a SQLite database')
+
+        for path in options['views']:
+            try:
+                view = import_string(path)()
+            except ImportError as err:
+                raise CommandError(str(err))
+            model, search_fields = view.model, get_search_field_names(view.get_list_search())
+            if not search_fields:
+                raise CommandError(f'{path} does not define list_search')
+            table = get_fts_table(model, search_fields)
+
+            if options['drop']:
+                drop_fts_index(model, search_fields, using)
+                self.stdout.write(f'{path}: dropped {table}')
+                continue
+            try:
+                with transaction.atomic(using=using):
+                    count = create_fts_index(model, search_fields, using)
+            except ValueError as err:
+                raise CommandError(f'{path}: {err}')
+            self.stdout.write(f'{path}: {count} rows indexed in {table}')
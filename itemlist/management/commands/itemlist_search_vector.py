@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.module_loading import import_string
+
+from itemlist.search import (
+    create_search_vector, drop_search_vector, get_search_field_names, get_vector_column, refresh_search_vector
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Create, refresh or drop the stored full text search vector of an ItemListView on PostgreSQL. '
+        'Lists use the stored vector automatically once it exists.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('views', nargs='+', help='Dotted paths of ItemListView subclasses')
+        parser.add_argument(
+            '--refresh', action='store_true',
+            help='Only recompute the vectors, for example after changes made with the triggers disabled'
+        )
+        parser.add_argument('--drop', action='store_true', help='Remove the stored vectors')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias to use')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if connections[using].vendor != 'postgresql':
+            raise CommandError('Stored search vectors require a PostgreSQL database')
+
+        for path in options['views']:
+            try:
+                view = import_string(path)()
+            except ImportError as err:
+                raise CommandError(str(err))
+            model, search_fields = view.model, get_search_field_names(view.get_list_search())
+            if not search_fields:
+                raise CommandError(f'{path} does not define list_search')
+            column = get_vector_column(model, search_fields)
+
+            try:
+                if options['drop']:
+                    drop_search_vector(model, search_fields, using)
+                    self.stdout.write(f'{path}: dropped {model._meta.db_table}.{column}')
+                    continue
+                elif options['refresh']:
+                    count = refresh_search_vector(model, search_fields, using)
+                else:
+                    count = create_search_vector(model, search_fields, using)
+            except ValueError as err:
+                raise CommandError(f'{path}: {err}')
+            self.stdout.write(f'{path}: {count} rows indexed in {model._meta.db_table}.{column}')
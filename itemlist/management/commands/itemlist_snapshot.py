@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from itemlist.search import table_exists
+from itemlist.snapshots import (
+    create_snapshot, drop_snapshot, get_snapshot_table, get_snapshot_view, refresh_snapshot, refresh_stale_snapshots
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Create or refresh the snapshot of the columns of an ItemListView, a materialized view on PostgreSQL and a '
+        'table on other databases. Lists with `materialized` enabled are served from their snapshot once it exists. '
+        'Without views, the views listed in the ITEMLIST_SNAPSHOTS setting are used. Run with --stale periodically '
+        'to refresh the snapshots whose models changed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('views', nargs='*', help='Dotted paths of ItemListView subclasses')
+        parser.add_argument('--drop', action='store_true', help='Remove the snapshots')
+        parser.add_argument('--rebuild', action='store_true', help='Create the snapshots again instead of refreshing')
+        parser.add_argument(
+            '--stale', action='store_true', help='Only refresh the existing snapshots whose models changed since'
+        )
+        parser.add_argument(
+            '--concurrently', action='store_true',
+            help='Refresh without blocking reads of the snapshots, PostgreSQL only'
+        )
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias to use')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if options['concurrently'] and connections[using].vendor != 'postgresql':
+            raise CommandError('Concurrent refresh requires a PostgreSQL database')
+        paths = options['views'] or getattr(settings, 'ITEMLIST_SNAPSHOTS', [])
+        if not paths:
+            raise CommandError('No views given and the ITEMLIST_SNAPSHOTS setting is empty')
+
+        if options['stale']:
+            try:
+                refreshed = refresh_stale_snapshots(using, paths)
+            except ImportError as err:
+                raise CommandError(str(err))
+            for path, count in refreshed.items():
+                self.stdout.write(f'{path}: {count} rows refreshed')
+            return
+
+        for path in paths:
+            try:
+                view = get_snapshot_view(path)
+            except ImportError as err:
+                raise CommandError(str(err))
+            table = get_snapshot_table(view)
+
+            if options['drop']:
+                drop_snapshot(view, using)
+                self.stdout.write(f'{path}: dropped {table}')
+                continue
+            exists = table_exists(using, table)
+            try:
+                if options['rebuild'] or not exists:
+                    count = create_snapshot(view, using)
+                else:
+                    count = refresh_snapshot(view, using, concurrently=options['concurrently'])
+            except ValueError as err:
+                raise CommandError(f'{path}: {err}')
+            action = 'refreshed' if exists and not options['rebuild'] else 'created'
+            self.stdout.write(f'{path}: {count} rows {action} in {table}')
@@ -0,0 +1,19 @@
+from .routers import stick_to_primary
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+class StickyPrimaryMiddleware:
+    """
+    Mark the clients which made a successful write request, so that the lists they display during the next
+    `ITEMLIST_STICKY_PRIMARY` seconds read from the primary database and show their own changes.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            stick_to_primary(response)
+        return response
@@ -0,0 +1,554 @@
+import datetime
+import decimal
+import hashlib
+import json
+import uuid
+
+from django.contrib.admin.utils import get_fields_from_path
+from django.core import signing
+from django.core.cache import caches
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db import connections, models
+from django.db.models import F, Q
+from django.utils.functional import cached_property
+from django.utils.http import urlencode
+
+from .timing import timed
+
+CURSOR_VAR = 'cursor'
+CURSOR_SALT = 'itemlist.cursor'
+MAX_RELATION_DEPTH = 5
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        # full isoformat, keyset comparisons must not lose the microseconds
+        return value.isoformat()
+    elif isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not cursor serializable')
+
+
+class CursorSerializer:
+    """
+    JSON serializer for signing.dumps and signing.loads which preserves full precision of dates and times.
+    """
+
+    def dumps(self, obj):
+        return json.dumps(obj, separators=(',', ':'), default=_encode_value).encode('latin-1')
+
+    def loads(self, data):
+        return json.loads(data.decode('latin-1'))
+
+
+def path_is_nullable(model, path):
+    """
+    Check if a field path can produce NULL values, either because a field along the path is nullable or because
+    the path crosses a multi-valued or reverse relation.
+    :param model: the model on which the path starts
+    :param path: double-underscore field path
+    :return: bool
+    """
+    if path == 'pk':
+        return False
+    try:
+        fields = get_fields_from_path(model, path)
+    except (FieldDoesNotExist, AttributeError):
+        return True
+    return any(
+        getattr(field, 'null', True) or field.many_to_many or field.one_to_many
+        for field in fields
+    )
+
+
+class RowValueComparison(models.Expression):
+    """
+    A row-value comparison such as `(a, b, c) > (%s, %s, %s)` usable directly in `QuerySet.filter()`.
+    """
+    conditional = True
+
+    def __init__(self, lhs, operator, rhs):
+        super().__init__(output_field=models.BooleanField())
+        self.lhs = list(lhs)
+        self.rhs = list(rhs)
+        self.operator = operator
+
+    def get_source_expressions(self):
+        return [*self.lhs, *self.rhs]
+
+    def set_source_expressions(self, exprs):
+        self.lhs, self.rhs = exprs[:len(self.lhs)], exprs[len(self.lhs):]
+
+    def as_sql(self, compiler, connection):
+        lhs_sql, rhs_sql, params = [], [], []
+        for column in self.lhs:
+            sql, column_params = compiler.compile(column)
+            lhs_sql.append(sql)
+            params.extend(column_params)
+        for column, value in zip(self.lhs, self.rhs):
+            sql, value_params = compiler.compile(models.Value(value.value, output_field=column.output_field))
+            rhs_sql.append(sql)
+            params.extend(value_params)
+        return '({}) {} ({})'.format(', '.join(lhs_sql), self.operator, ', '.join(rhs_sql)), params
+
+
+class CountStrategy:
+    """
+    Base class for the strategies used by ItemPaginator to determine the total number of items.
+    """
+
+    def get_count(self, queryset, view):
+        """
+        Count the items in the queryset
+        :param queryset: the filtered queryset of the list
+        :param view: the ItemListView instance
+        :return: tuple (count, exact), exact should be False if the count is only a lower bound or an estimate
+        """
+        raise NotImplementedError
+
+    def get_label(self, count, exact):
+        """
+        Text to display for the count
+        :param count: the count returned by get_count
+        :param exact: whether the count is exact
+        :return: str
+        """
+        return f'{count}' if exact else f'~{count:,}'
+
+
+class ExactCount(CountStrategy):
+    """
+    Exact `COUNT(*)` of the queryset, the default.
+    """
+
+    def get_count(self, queryset, view):
+        return queryset.count(), True
+
+
+class CappedCount(CountStrategy):
+    """
+    Count at most `limit` items using a LIMITed subquery, so that the database can stop scanning early.
+    Larger lists are displayed as "10,000+".
+    """
+
+    def __init__(self, limit=10000):
+        self.limit = limit
+
+    def get_count(self, queryset, view):
+        count = queryset.order_by()[:self.limit + 1].count()
+        if count > self.limit:
+            return self.limit, False
+        return count, True
+
+    def get_label(self, count, exact):
+        return f'{count}' if exact else f'{count:,}+'
+
+
+class EstimatedCount(CountStrategy):
+    """
+    Use the query planner's row estimate (`pg_class.reltuples`) for unfiltered lists on PostgreSQL.
+    Filtered lists, other databases and tables smaller than `threshold` rows use the `fallback` strategy.
+    """
+
+    def __init__(self, threshold=10000, fallback=None):
+        self.threshold = threshold
+        self.fallback = fallback or ExactCount()
+
+    def get_count(self, queryset, view):
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where and not queryset.query.distinct:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                    [connection.ops.quote_name(queryset.model._meta.db_table)]
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= self.threshold:
+                return int(row[0]), False
+        return self.fallback.get_count(queryset, view)
+
+    def get_label(self, count, exact):
+        return self.fallback.get_label(count, exact) if exact else f'~{count:,}'
+
+
+class CachedCount(CountStrategy):
+    """
+    Cache the result of the `strategy` (exact by default) for `timeout` seconds, keyed by the view class,
+    the URL kwargs and the normalized query string of the list.
+    """
+
+    def __init__(self, timeout=300, strategy=None, cache='default'):
+        self.timeout = timeout
+        self.strategy = strategy or ExactCount()
+        self.cache = cache
+
+    def get_cache_key(self, view):
+        from .views import ORDER_VAR, CSV_VAR, JSON_VAR
+        query_string = view.get_query_string(remove=[ORDER_VAR, CSV_VAR, JSON_VAR])
+        url_kwargs = sorted((k, str(v)) for k, v in view.kwargs.items() if k != view.page_kwarg)
+        state = f'{query_string}|{url_kwargs}'
+        view_name = f'{view.__class__.__module__}.{view.__class__.__qualname__}'
+        return 'itemlist:count:{}:{}'.format(view_name, hashlib.md5(state.encode('utf-8')).hexdigest())
+
+    def get_count(self, queryset, view):
+        cache = caches[self.cache]
+        key = self.get_cache_key(view)
+        result = cache.get(key)
+        if result is None:
+            result = self.strategy.get_count(queryset, view)
+            cache.set(key, result, self.timeout)
+        return tuple(result)
+
+    def get_label(self, count, exact):
+        return self.strategy.get_label(count, exact)
+
+
+COUNT_STRATEGIES = {
+    'exact': ExactCount,
+    'capped': CappedCount,
+    'estimated': EstimatedCount,
+    'cached': CachedCount,
+}
+
+
+class ItemPage(Page):
+    """
+    A page which can tell whether it has a next page without knowing the exact number of pages.
+    """
+
+    def __init__(self, object_list, number, paginator, has_next=None):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return super().has_next() if self._has_next is None else self._has_next
+
+
+class ItemPaginator(Paginator):
+    """
+    Paginator which delegates counting to a CountStrategy. When the count is not exact, pages beyond the
+    counted number of pages remain reachable.
+    """
+
+    def __init__(self, object_list, per_page, count_strategy=None, view=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_strategy = count_strategy
+        self.view = view
+        self.prefetched = None
+
+    @cached_property
+    def count_info(self):
+        with timed(self.view, 'count'):
+            if self.count_strategy is None:
+                return super().count, True
+            return self.count_strategy.get_count(self.object_list, self.view)
+
+    @cached_property
+    def count(self):
+        return self.count_info[0]
+
+    @property
+    def count_is_exact(self):
+        return self.count_info[1]
+
+    @property
+    def count_label(self):
+        if self.count_strategy is None:
+            return f'{self.count}'
+        return self.count_strategy.get_label(*self.count_info)
+
+    @property
+    def num_pages_label(self):
+        return f'{self.num_pages}' if self.count_is_exact else f'{self.num_pages}+'
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if self.count_is_exact or int(number) < 1:
+                raise
+            return int(number)
+
+    @property
+    def prefetch_size(self):
+        return self.per_page + max(self.orphans, 1)
+
+    def prefetch_page(self, number):
+        """
+        Fetch the rows of a page without counting the items, so that the count and the page can be queried
+        concurrently. Enough rows are fetched for `page()` to use them whatever the count turns out to be.
+        :param number: page number
+        """
+        bottom = (number - 1) * self.per_page
+        self.prefetched = (bottom, list(self.object_list[bottom:bottom + self.prefetch_size]))
+
+    def get_rows(self, bottom, top):
+        """
+        Return the items from `bottom` to `top`, taken from the prefetched rows when they cover the range
+        """
+        if self.prefetched is not None:
+            start, rows = self.prefetched
+            if start == bottom and top - bottom <= self.prefetch_size:
+                return rows[:top - bottom]
+        return self.object_list[bottom:top]
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        if self.count_is_exact:
+            top = bottom + self.per_page
+            if top + self.orphans >= self.count:
+                top = self.count
+            return self._get_page(self.get_rows(bottom, top), number, self)
+        rows = list(self.get_rows(bottom, bottom + self.per_page + 1))
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages['no_results'])
+        has_next = len(rows) > self.per_page
+        return self._get_page(rows[:self.per_page], number, self, has_next=has_next)
+
+    def _get_page(self, *args, **kwargs):
+        return ItemPage(*args, **kwargs)
+
+
+class CursorPage(Page):
+    """
+    A page of a CursorPaginator. Page numbers are carried along in the cursor so that templates can display them,
+    but navigation is only possible to the first, previous, next and last pages.
+    """
+
+    def __init__(self, object_list, number, paginator, previous_cursor=None, next_cursor=None):
+        super().__init__(object_list, number, paginator)
+        self.previous_cursor = previous_cursor
+        self.next_cursor = next_cursor
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return max(self.number - 1, 1)
+
+    def get_page_query(self, which):
+        """
+        Query string parameters for navigating to the first, previous, next or last page
+        :param which: one of 'first', 'previous', 'next', 'last'
+        :return: urlencoded query parameters without the leading '?'
+        """
+        cursor = {
+            'first': '',
+            'previous': self.previous_cursor,
+            'next': self.next_cursor,
+            'last': self.paginator.last_cursor,
+        }[which]
+        return urlencode({CURSOR_VAR: cursor or ''})
+
+
+class CursorPaginator(ItemPaginator):
+    """
+    Keyset (seek) paginator. Instead of OFFSET, pages are fetched by filtering on the ordering keys of the
+    last (or first) row of the adjacent page, so that every page costs the same as the first one.
+
+    The ordering of the queryset must be made up of field names, paths or annotation names and should be
+    deterministic, which ItemListView guarantees by always including the primary key.
+    """
+
+    def __init__(self, object_list, per_page, annotation_paths=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.keys = self.get_keys(object_list, annotation_paths or {})
+
+    @staticmethod
+    def get_keys(queryset, annotation_paths):
+        """
+        Determine the keyset from the ordering of the queryset
+        :param queryset: the queryset
+        :param annotation_paths: dictionary mapping annotation names to the field paths they were built from
+        :return: list of tuples (field_path, descending, nullable) or None if the ordering is not supported
+        """
+        ordering = CursorPaginator.expand_ordering(queryset.model, list(queryset.query.order_by))
+        if ordering is None:
+            return None
+        keys = []
+        for item in ordering:
+            path = item.lstrip('-')
+            if path in annotation_paths:
+                nullable = path_is_nullable(queryset.model, annotation_paths[path])
+            elif path in queryset.query.annotations:
+                nullable = True
+            else:
+                nullable = path_is_nullable(queryset.model, path)
+            keys.append((path, item.startswith('-'), nullable))
+        return keys
+
+    @staticmethod
+    def expand_ordering(model, ordering, prefix='', descending=False):
+        """
+        Expand ordering on relations into the ordering of the related model, the same way the database
+        compiler does it, so that the keys can be compared directly.
+        :param model: the model being ordered
+        :param ordering: list of ordering items
+        :param prefix: path prefix of the items
+        :param descending: whether the direction of the items should be flipped
+        :return: list of ordering strings or None if the ordering contains expressions
+        """
+        expanded = []
+        for item in ordering:
+            if not isinstance(item, str) or item.startswith('?') or '.' in item:
+                return None
+            path = item.lstrip('-')
+            direction = '-' if item.startswith('-') != descending else ''
+            try:
+                field = get_fields_from_path(model, path)[-1] if path != 'pk' else None
+            except (FieldDoesNotExist, AttributeError):
+                field = None
+            if field is not None and field.is_relation and field.related_model._meta.ordering:
+                if field.many_to_many or field.one_to_many or prefix.count('__') >= MAX_RELATION_DEPTH:
+                    return None
+                related = CursorPaginator.expand_ordering(
+                    field.related_model, field.related_model._meta.ordering,
+                    prefix=f'{prefix}{path}__', descending=bool(direction)
+                )
+                if related is None:
+                    return None
+                expanded.extend(related)
+            else:
+                expanded.append(f'{direction}{prefix}{path}')
+        return expanded
+
+    @property
+    def is_supported(self):
+        return self.keys is not None
+
+    @property
+    def last_cursor(self):
+        return self.encode_cursor(None, previous=True, number=self.num_pages)
+
+    def encode_cursor(self, values, previous=False, number=1):
+        payload = {'k': values, 'p': int(previous), 'n': number, 'o': [key[0] for key in self.keys]}
+        return signing.dumps(payload, salt=CURSOR_SALT, serializer=CursorSerializer, compress=True)
+
+    def decode_cursor(self, cursor):
+        try:
+            payload = signing.loads(cursor, salt=CURSOR_SALT, serializer=CursorSerializer)
+        except signing.BadSignature:
+            return None
+        if not isinstance(payload, dict) or payload.get('o') != [key[0] for key in self.keys]:
+            return None
+        values = payload.get('k')
+        if values is not None and (not isinstance(values, list) or len(values) != len(self.keys)):
+            return None
+        if not isinstance(payload.get('n'), int) or payload.get('p') not in (0, 1):
+            return None
+        return payload
+
+    def seek_filter(self, aliases, values, previous=False):
+        """
+        Build the filter selecting the rows strictly after (or before) the given key values.
+        A single row-value comparison is used when all keys share the same direction and are not nullable,
+        otherwise the equivalent lexicographic expansion is used, with NULLs sorted last.
+        :param aliases: annotation names of the keys
+        :param values: key values of the reference row
+        :param previous: if True, select the rows before the reference row
+        :return: Q or expression
+        """
+        directions = {descending for _, descending, _ in self.keys}
+        nullable = any(key[2] for key in self.keys)
+        row_values = connections[self.object_list.db].vendor != 'oracle'
+        if row_values and len(directions) == 1 and not nullable and None not in values:
+            descending = directions.pop()
+            operator = '<' if descending != previous else '>'
+            return RowValueComparison([F(alias) for alias in aliases], operator, [models.Value(v) for v in values])
+
+        conditions = []
+        equal = Q()
+        for alias, (path, descending, nullable), value in zip(aliases, self.keys, values):
+            if value is None:
+                seek = Q(**{f'{alias}__isnull': False}) if previous else None
+            else:
+                lookup = 'lt' if descending != previous else 'gt'
+                seek = Q(**{f'{alias}__{lookup}': value})
+                if nullable and not previous:
+                    seek |= Q(**{f'{alias}__isnull': True})
+            if seek is not None:
+                conditions.append(equal & seek)
+            equal &= Q(**{f'{alias}__isnull': True}) if value is None else Q(**{alias: value})
+        if not conditions:
+            return Q(pk__in=[])
+        query = conditions[0]
+        for condition in conditions[1:]:
+            query |= condition
+        return query
+
+    def prefetch_page(self, cursor):
+        """
+        Fetch the page for the given cursor ahead of `get_cursor_page()`, so that it can be queried concurrently
+        with the count.
+        :param cursor: opaque cursor string from the query string
+        """
+        self.prefetched = (cursor, self.get_cursor_page(cursor))
+
+    def get_cursor_page(self, cursor):
+        """
+        Return the page for the given cursor, or the first page if the cursor is empty or invalid
+        :param cursor: opaque cursor string from the query string
+        :return: CursorPage
+        """
+        if self.prefetched is not None and self.prefetched[0] == cursor:
+            return self.prefetched[1]
+        payload = self.decode_cursor(cursor) if cursor else None
+        if payload is None:
+            payload = {'k': None, 'p': 0, 'n': 1}
+        previous = bool(payload['p'])
+        values = payload['k']
+
+        aliases = [f'_cursor_{i}' for i in range(len(self.keys))]
+        queryset = self.object_list.annotate(**{
+            alias: F(path) for alias, (path, _, _) in zip(aliases, self.keys)
+        })
+        fields = [queryset.query.annotations[alias].output_field for alias in aliases]
+        order_by = []
+        for alias, (path, descending, nullable) in zip(aliases, self.keys):
+            # NULLs are always last in the forward direction, regardless of the database
+            nulls = {} if not nullable else {'nulls_first': True} if previous else {'nulls_last': True}
+            order_by.append(F(alias).desc(**nulls) if descending != previous else F(alias).asc(**nulls))
+        queryset = queryset.order_by(*order_by)
+
+        if values is not None:
+            try:
+                values = [None if v is None else field.to_python(v) for field, v in zip(fields, values)]
+            except ValidationError:
+                return self.get_cursor_page(None)
+            queryset = queryset.filter(self.seek_filter(aliases, values, previous=previous))
+
+        if previous and values is None and self.count_is_exact:
+            # last page, only fetch the remainder so that pages line up with the offset pages
+            limit = self.count - (self.num_pages - 1) * self.per_page
+        else:
+            limit = self.per_page
+        rows = list(queryset[:limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if previous:
+            rows.reverse()
+
+        number = max(payload['n'], 1)
+        if previous and not has_more:
+            number = 1
+        first_values = [getattr(rows[0], alias) for alias in aliases] if rows else None
+        last_values = [getattr(rows[-1], alias) for alias in aliases] if rows else None
+
+        if previous:
+            has_previous, has_next = has_more, values is not None
+        else:
+            has_previous, has_next = values is not None, has_more
+        previous_cursor = next_cursor = None
+        if rows and has_previous:
+            previous_cursor = self.encode_cursor(first_values, previous=True, number=number - 1)
+        if rows and has_next:
+            next_cursor = self.encode_cursor(last_values, number=number + 1)
+        return CursorPage(rows, number, self, previous_cursor=previous_cursor, next_cursor=next_cursor)
@@ -0,0 +1,54 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARY_COOKIE = 'itemlist_primary'
+
+read_alias = ContextVar('itemlist_read_alias', default=None)
+
+
+@contextmanager
+def reading_from(alias):
+    """
+    Route the read queries made within the block to the given database alias through `ListRouter`
+    :param alias: database alias
+    """
+    token = read_alias.set(alias)
+    try:
+        yield
+    finally:
+        read_alias.reset(token)
+
+
+def get_sticky_timeout():
+    """
+    Number of seconds during which a client reads from the primary database after a write, selected through the
+    `ITEMLIST_STICKY_PRIMARY` setting. Default is 10.
+    """
+    return getattr(settings, 'ITEMLIST_STICKY_PRIMARY', 10)
+
+
+def stick_to_primary(response):
+    """
+    Mark the client so that its next list requests, within the sticky window, read from the primary database
+    :param response: the response of the write request
+    """
+    response.set_cookie(PRIMARY_COOKIE, '1', max_age=get_sticky_timeout(), httponly=True, samesite='Lax')
+
+
+def is_sticky(request):
+    """
+    Check whether the client made a write recently and should read from the primary database
+    """
+    return PRIMARY_COOKIE in request.COOKIES
+
+
+class ListRouter:
+    """
+    Database router sending the read queries made while a list is displayed, such as the lookups of the list
+    filters, to the alias selected by the view. Other queries are left to the next routers.
+    """
+
+    def db_for_read(self, model, **hints):
+        return read_alias.get()
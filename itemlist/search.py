@@ -0,0 +1,765 @@
+import hashlib
+import operator
+from functools import lru_cache, reduce
+from itertools import groupby
+
+from django.conf import settings
+from django.contrib.admin.utils import get_fields_from_path
+from django.db import connections, models
+from django.db.models import F
+from django.db.models.expressions import Col, Expression, RawSQL
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.lookups import Lookup
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.utils.module_loading import import_string
+
+from .cache import get_cache, make_key
+
+try:
+    from django.contrib.admin.utils import lookup_needs_distinct
+except ImportError:
+    from django.contrib.admin.utils import lookup_spawns_duplicates as lookup_needs_distinct
+
+VECTOR_PREFIX = 'itemlist_search'
+VECTOR_ALIAS = '_itemlist_vector'
+FTS_PREFIX = 'itemlist_fts'
+FTS_BATCH_SIZE = 2000
+SCHEMA_PREFIX = 'itemlist:schema'
+
+
+def get_search_field_names(search_fields):
+    """
+    Strip the lookup prefixes ('^', '=' and '@') from the search fields of a list
+    """
+    return tuple(str(field_name).lstrip('^=@') for field_name in search_fields)
+
+
+def get_search_vector(search_fields):
+    """
+    Full text search vector combining the search fields, as used by the PostgreSQL search of lists
+    :param search_fields: search fields of the list
+    :return: SearchVector expression
+    """
+    from django.contrib.postgres.search import SearchVector
+    return reduce(
+        operator.__add__, (
+            SearchVector(F(field_name), weight='A') for field_name in get_search_field_names(search_fields)
+        )
+    )
+
+
+def get_index_name(prefix, model, search_fields):
+    """
+    Name of a search index for the search fields of a model. The name changes with the search fields, so that
+    a stale index is never used after the fields of a list are changed.
+    """
+    parts = (model._meta.db_table,) + get_search_field_names(search_fields)
+    digest = hashlib.md5(':'.join(parts).encode('utf-8')).hexdigest()[:10]
+    return f'{prefix}_{digest}'
+
+
+def get_vector_column(model, search_fields):
+    """
+    Name of the stored search vector column for the search fields of a model
+    """
+    return get_index_name(VECTOR_PREFIX, model, search_fields)
+
+
+def get_schema_timeout():
+    """
+    Number of seconds during which the existence of the tables and columns created by the management commands
+    is cached, selected through the `ITEMLIST_SCHEMA_TIMEOUT` setting. Default is 60. The commands update the
+    cache when they create or drop them, so processes sharing the itemlist cache with them see the changes at once.
+    """
+    return getattr(settings, 'ITEMLIST_SCHEMA_TIMEOUT', 60)
+
+
+def get_schema_key(using, table, column=None):
+    return make_key(SCHEMA_PREFIX, using, table, column)
+
+
+def set_schema_state(key, exists):
+    if exists is None:
+        get_cache().delete(key)
+    else:
+        get_cache().set(key, exists, get_schema_timeout())
+
+
+def set_table_exists(using, table, exists):
+    """
+    Record whether a table exists in the itemlist cache, or forget it if `exists` is None so that the next
+    check queries the database
+    """
+    set_schema_state(get_schema_key(using, table), exists)
+
+
+def set_column_exists(using, table, column, exists):
+    """
+    Record whether a column of a table exists in the itemlist cache, or forget it if `exists` is None
+    """
+    set_schema_state(get_schema_key(using, table, column), exists)
+
+
+def table_exists(using, table):
+    """
+    Whether a table exists, cached for `ITEMLIST_SCHEMA_TIMEOUT` seconds
+    """
+    key = get_schema_key(using, table)
+    exists = get_cache().get(key)
+    if exists is None:
+        connection = connections[using]
+        with connection.cursor() as cursor:
+            exists = table in connection.introspection.table_names(cursor)
+        set_schema_state(key, exists)
+    return exists
+
+
+def column_exists(using, table, column):
+    """
+    Whether a column of a table exists, cached for `ITEMLIST_SCHEMA_TIMEOUT` seconds
+    """
+    key = get_schema_key(using, table, column)
+    exists = get_cache().get(key)
+    if exists is None:
+        connection = connections[using]
+        with connection.cursor() as cursor:
+            description = connection.introspection.get_table_description(cursor, table)
+        exists = any(info.name == column for info in description)
+        set_schema_state(key, exists)
+    return exists
+
+
+def get_stored_vector(model, search_fields, using):
+    """
+    Return an expression for the stored search vector of the search fields if it has been created by the
+    `itemlist_search_vector` management command. The existence of the column is cached for
+    `ITEMLIST_SCHEMA_TIMEOUT` seconds.
+    :param model: the model of the list
+    :param search_fields: search fields of the list
+    :param using: database alias
+    :return: StoredVector expression or None
+    """
+    if connections[using].vendor != 'postgresql':
+        return None
+    column = get_vector_column(model, search_fields)
+    if not column_exists(using, model._meta.db_table, column):
+        return None
+    return StoredVector(column)
+
+
+class StoredVector(Expression):
+    """
+    Reference to a stored search vector column of the model table, which is not declared on the model.
+    """
+
+    def __init__(self, column):
+        from django.contrib.postgres.search import SearchVectorField
+        super().__init__(output_field=SearchVectorField())
+        self.column = column
+
+    def resolve_expression(self, query=None, allow_joins=True, reuse=None, summarize=False, for_save=False):
+        from django.contrib.postgres.search import SearchVectorField
+        target = SearchVectorField()
+        target.column = self.column
+        target.model = query.model
+        return Col(query.get_initial_alias(), target)
+
+
+def get_source_columns(model, search_fields):
+    """
+    Columns of the model table the search vector depends on. Search fields spanning multi-valued or reverse
+    relations can not be stored, since they match several rows or are not reachable from the row.
+    :return: list of column names
+    """
+    columns = []
+    for field_name in get_search_field_names(search_fields):
+        fields = get_fields_from_path(model, field_name)
+        if any(field.many_to_many or field.one_to_many or not field.concrete for field in fields):
+            raise ValueError(
+                f'Search field "{field_name}" spans a multi-valued or reverse relation and can not be stored'
+            )
+        if fields[0].column not in columns:
+            columns.append(fields[0].column)
+    return columns
+
+
+def get_related_sources(model, search_fields):
+    """
+    Related models whose fields are included in the search vector, with the path of the relation from the model
+    and the columns of their table the vector depends on
+    :return: dictionary mapping tuples (related model, path) to lists of column names
+    """
+    sources = {}
+    for field_name in get_search_field_names(search_fields):
+        fields = get_fields_from_path(model, field_name)
+        parts = field_name.split('__')
+        for i in range(1, len(fields)):
+            columns = sources.setdefault((fields[i - 1].related_model, '__'.join(parts[:i])), [])
+            if fields[i].column not in columns:
+                columns.append(fields[i].column)
+    return sources
+
+
+def get_vector_query(model, search_fields, using):
+    """
+    SQL selecting the primary key and the search vector of the model rows
+    :return: tuple (sql, params)
+    """
+    queryset = model._base_manager.using(using).annotate(**{VECTOR_ALIAS: get_search_vector(search_fields)})
+    return queryset.order_by().values_list('pk', VECTOR_ALIAS).query.sql_with_params()
+
+
+def get_trigger_vector(model, search_fields, using):
+    """
+    SQL computing the search vector of the row being saved from the `NEW` record of a trigger, like
+    `get_search_vector()`. Fields of related objects are read by subqueries following the foreign keys.
+    """
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    vectors = []
+    for field_name in get_search_field_names(search_fields):
+        fields = get_fields_from_path(model, field_name)
+        value = f'NEW.{qn(fields[0].column)}'
+        if len(fields) > 1:
+            queryset = fields[0].related_model._base_manager.using(using).filter(
+                **{fields[0].target_field.name: RawSQL(value, ())}
+            )
+            sql, params = queryset.order_by().values_list(field_name.split('__', 1)[1]).query.sql_with_params()
+            value = connection.ops.compose_sql(f'({sql})', params)
+        vectors.append(f"setweight(to_tsvector(COALESCE(({value})::text, '')), 'A')")
+    return ' || '.join(vectors)
+
+
+def refresh_search_vector(model, search_fields, using):
+    """
+    Recompute the stored search vector of all rows, for example after the rows were changed with the triggers
+    maintaining the vector disabled.
+    :return: number of rows updated
+    """
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    table, pk_column = model._meta.db_table, model._meta.pk.column
+    column = get_vector_column(model, search_fields)
+    sql, params = get_vector_query(model, search_fields, using)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {qn(table)} SET {qn(column)} = vectors.vector FROM ({sql}) AS vectors(pk, vector) '
+            f'WHERE {qn(table)}.{qn(pk_column)} = vectors.pk',
+            params
+        )
+        return cursor.rowcount
+
+
+def create_search_vector(model, search_fields, using):
+    """
+    Create the stored search vector column of the search fields with a GIN index, and compute it for the
+    existing rows. A trigger computes the vector before rows of the model are saved, and triggers on the tables
+    of related models included in the vector update the rows referencing the related objects they change.
+    :return: number of rows updated
+    """
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    table = model._meta.db_table
+    column = get_vector_column(model, search_fields)
+    sources = get_source_columns(model, search_fields)
+    vector_sql = get_trigger_vector(model, search_fields, using)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE {qn(table)} ADD COLUMN IF NOT EXISTS {qn(column)} tsvector')
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {qn(column + "_idx")} ON {qn(table)} USING GIN ({qn(column)})')
+        cursor.execute(
+            f'CREATE OR REPLACE FUNCTION {qn(column + "_update")}() RETURNS trigger AS $$ BEGIN '
+            f'NEW.{qn(column)} := {vector_sql}; RETURN NEW; END $$ LANGUAGE plpgsql'
+        )
+        cursor.execute(f'DROP TRIGGER IF EXISTS {qn(column + "_trigger")} ON {qn(table)}')
+        cursor.execute(
+            f'CREATE TRIGGER {qn(column + "_trigger")} BEFORE INSERT OR UPDATE OF {", ".join(map(qn, sources))} '
+            f'ON {qn(table)} FOR EACH ROW EXECUTE FUNCTION {qn(column + "_update")}()'
+        )
+        for i, ((related, path), columns) in enumerate(get_related_sources(model, search_fields).items()):
+            # updating the foreign key to itself fires the trigger computing the vector of the referencing rows
+            name = f'{column}_{i}'
+            related_table, related_pk = related._meta.db_table, related._meta.pk.column
+            sql, params = model._base_manager.using(using).filter(
+                **{f'{path}__pk': RawSQL(f'NEW.{qn(related_pk)}', ())}
+            ).order_by().values('pk').query.sql_with_params()
+            rows_sql = connection.ops.compose_sql(sql, params)
+            cursor.execute(
+                f'CREATE OR REPLACE FUNCTION {qn(name)}() RETURNS trigger AS $$ BEGIN '
+                f'UPDATE {qn(table)} SET {qn(sources[0])} = {qn(sources[0])} '
+                f'WHERE {qn(model._meta.pk.column)} IN ({rows_sql}); RETURN NULL; END $$ LANGUAGE plpgsql'
+            )
+            old = ', '.join(f'OLD.{qn(source)}' for source in columns)
+            new = ', '.join(f'NEW.{qn(source)}' for source in columns)
+            cursor.execute(f'DROP TRIGGER IF EXISTS {qn(name)} ON {qn(related_table)}')
+            cursor.execute(
+                f'CREATE TRIGGER {qn(name)} AFTER UPDATE OF {", ".join(map(qn, columns))} ON {qn(related_table)} '
+                f'FOR EACH ROW WHEN (ROW({old}) IS DISTINCT FROM ROW({new})) EXECUTE FUNCTION {qn(name)}()'
+            )
+    set_column_exists(using, table, column, True)
+    return refresh_search_vector(model, search_fields, using)
+
+
+def drop_search_vector(model, search_fields, using):
+    """
+    Remove the stored search vector column of the search fields, its index and triggers.
+    """
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    table = model._meta.db_table
+    column = get_vector_column(model, search_fields)
+    with connection.cursor() as cursor:
+        for i, (related, path) in enumerate(get_related_sources(model, search_fields)):
+            cursor.execute(f'DROP TRIGGER IF EXISTS {qn(f"{column}_{i}")} ON {qn(related._meta.db_table)}')
+            cursor.execute(f'DROP FUNCTION IF EXISTS {qn(f"{column}_{i}")}()')
+        cursor.execute(f'DROP TRIGGER IF EXISTS {qn(column + "_trigger")} ON {qn(table)}')
+        cursor.execute(f'DROP FUNCTION IF EXISTS {qn(column + "_update")}()')
+        cursor.execute(f'ALTER TABLE {qn(table)} DROP COLUMN IF EXISTS {qn(column)}')
+    set_column_exists(using, table, column, False)
+
+
+def get_fts_table(model, search_fields):
+    """
+    Name of the SQLite FTS5 table indexing the search fields of a model
+    """
+    return get_index_name(FTS_PREFIX, model, search_fields)
+
+
+def get_fts_match(search_term):
+    """
+    FTS5 query matching any of the words of the search term as a prefix of the indexed words
+    """
+    words = ['"{}"*'.format(word.replace('"', '""')) for word in search_term.split()]
+    return ' OR '.join(words)
+
+
+@lru_cache(maxsize=None)
+def get_fts_indexes():
+    """
+    Return a dictionary mapping models to the tuples of search fields indexed with FTS5, for the views listed
+    in the `ITEMLIST_SEARCH_INDEXES` setting.
+    """
+    indexes = {}
+    for path in getattr(settings, 'ITEMLIST_SEARCH_INDEXES', []):
+        view = import_string(path)()
+        indexes.setdefault(view.model, set()).add(get_search_field_names(view.get_list_search()))
+    return indexes
+
+
+@lru_cache(maxsize=None)
+def get_fts_dependencies():
+    """
+    Return a dictionary mapping related models to the (model, search fields, relation path) of the FTS5 indexes
+    which include their fields, so that the rows of the index can be updated when related objects change.
+    """
+    dependencies = {}
+    for model, indexes in get_fts_indexes().items():
+        for search_fields in indexes:
+            for field_name in search_fields:
+                path = []
+                for field in get_fields_from_path(model, field_name)[:-1]:
+                    path.append(field.name)
+                    dependencies.setdefault(field.related_model, set()).add((model, search_fields, '__'.join(path)))
+    return dependencies
+
+
+def get_fts_rows(model, search_fields, using, pks=None):
+    """
+    Generate the rows of the FTS5 index of the model. Values of fields spanning multi-valued relations are
+    joined into a single text.
+    :param pks: optional primary keys of the rows to generate, all rows by default
+    :return: generator of tuples (pk, text, ...)
+    """
+    queryset = model._base_manager.using(using).order_by('pk')
+    if pks is not None:
+        queryset = queryset.filter(pk__in=pks)
+    values = queryset.values_list('pk', *search_fields).iterator(chunk_size=FTS_BATCH_SIZE)
+    for pk, items in groupby(values, key=operator.itemgetter(0)):
+        texts = [[] for _ in search_fields]
+        for item in items:
+            for text, value in zip(texts, item[1:]):
+                if value is not None and str(value) not in text:
+                    text.append(str(value))
+        yield (pk, *(' '.join(text) for text in texts))
+
+
+def update_fts_rows(model, search_fields, using, pks=None):
+    """
+    Write the rows of the FTS5 index of the model
+    :param pks: optional primary keys of the rows to update, all rows by default
+    :return: number of rows written
+    """
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    table = get_fts_table(model, search_fields)
+    columns = ', '.join(['rowid'] + [f'c{i}' for i in range(len(search_fields))])
+    placeholders = ', '.join(['%s'] * (len(search_fields) + 1))
+    count = 0
+    rows = get_fts_rows(model, search_fields, using, pks)
+    with connection.cursor() as cursor:
+        if pks is None:
+            cursor.execute(f'DELETE FROM {qn(table)}')
+        else:
+            pks = list(pks)
+            for i in range(0, len(pks), FTS_BATCH_SIZE):
+                batch = pks[i:i + FTS_BATCH_SIZE]
+                cursor.execute(
+                    f'DELETE FROM {qn(table)} WHERE rowid IN ({", ".join(["%s"] * len(batch))})', batch
+                )
+        while True:
+            batch = [row for _, row in zip(range(FTS_BATCH_SIZE), rows)]
+            if not batch:
+                break
+            cursor.executemany(f'INSERT INTO {qn(table)} ({columns}) VALUES ({placeholders})', batch)
+            count += len(batch)
+    return count
+
+
+def create_fts_index(model, search_fields, using):
+    """
+    Create the FTS5 table indexing the search fields of a model and fill it. The rowid of the table is the
+    primary key of the model, which must be an integer.
+    :return: number of rows indexed
+    """
+    if model._meta.pk.get_internal_type() not in ('AutoField', 'BigAutoField', 'SmallAutoField', 'IntegerField',
+                                                  'BigIntegerField', 'SmallIntegerField', 'PositiveIntegerField'):
+        raise ValueError(f'{model._meta.label} must have an integer primary key to be indexed with FTS5')
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    table = get_fts_table(model, search_fields)
+    columns = ', '.join(f'c{i}' for i in range(len(search_fields)))
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {qn(table)}')
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE {qn(table)} USING fts5({columns}, tokenize="unicode61 remove_diacritics 2")'
+        )
+    set_table_exists(using, table, True)
+    return update_fts_rows(model, search_fields, using)
+
+
+def drop_fts_index(model, search_fields, using):
+    """
+    Remove the FTS5 table indexing the search fields of a model
+    """
+    connection = connections[using]
+    table = get_fts_table(model, search_fields)
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {connection.ops.quote_name(table)}')
+    set_table_exists(using, table, False)
+
+
+def get_fts_filter(model, search_fields, search_term, using):
+    """
+    Return a filter matching the search term with the FTS5 index of the search fields, if the index has been
+    created by the `itemlist_fts_index` management command and is kept up to date through the
+    `ITEMLIST_SEARCH_INDEXES` setting.
+    :param model: the model of the list
+    :param search_fields: search fields of the list
+    :param search_term: search string
+    :param using: database alias
+    :return: Q object or None
+    """
+    search_fields = get_search_field_names(search_fields)
+    if connections[using].vendor != 'sqlite' or search_fields not in get_fts_indexes().get(model, ()):
+        return None
+    table = get_fts_table(model, search_fields)
+    if not table_exists(using, table):
+        return None
+    match = get_fts_match(search_term)
+    if not match:
+        return None
+    qn = connections[using].ops.quote_name
+    return models.Q(pk__in=RawSQL(f'SELECT rowid FROM {qn(table)} WHERE {qn(table)} MATCH %s', (match,)))
+
+
+def update_fts_indexes(model, pks, using):
+    """
+    Update the rows of all FTS5 indexes affected by changes to objects of a model
+    :param model: the changed model
+    :param pks: primary keys of the changed objects
+    :param using: database alias
+    """
+    if not pks or connections[using].vendor != 'sqlite':
+        return
+    for search_fields in get_fts_indexes().get(model, ()):
+        if table_exists(using, get_fts_table(model, search_fields)):
+            update_fts_rows(model, search_fields, using, pks)
+    for indexed, search_fields, path in get_fts_dependencies().get(model, ()):
+        if table_exists(using, get_fts_table(indexed, search_fields)):
+            related = indexed._base_manager.using(using).filter(**{f'{path}__pk__in': pks})
+            update_fts_rows(indexed, search_fields, using, list(related.values_list('pk', flat=True).distinct()))
+
+
+def get_fts_related(instance, using):
+    """
+    Primary keys of the indexed objects related to an instance, for each existing index depending on its model
+    """
+    return {
+        (indexed, search_fields): list(
+            indexed._base_manager.using(using).filter(**{f'{path}__pk': instance.pk}).values_list('pk', flat=True)
+        )
+        for indexed, search_fields, path in get_fts_dependencies().get(type(instance), ())
+        if table_exists(using, get_fts_table(indexed, search_fields))
+    }
+
+
+def fts_object_saved(sender, instance, using, **kwargs):
+    update_fts_indexes(sender, [instance.pk], using)
+
+
+def fts_object_deleting(sender, instance, using, **kwargs):
+    # relations are removed with the object, collect the related indexed objects before
+    if sender in get_fts_dependencies():
+        instance._itemlist_fts_related = get_fts_related(instance, using)
+
+
+def fts_object_deleted(sender, instance, using, **kwargs):
+    update_fts_indexes(sender, [instance.pk], using)
+    for (indexed, search_fields), pks in instance.__dict__.pop('_itemlist_fts_related', {}).items():
+        if pks:
+            update_fts_rows(indexed, search_fields, using, pks)
+
+
+def fts_relation_changed(sender, instance, action, model, pk_set, using, **kwargs):
+    if action == 'pre_clear':
+        # the cleared objects are not known after the relation is cleared
+        instance._itemlist_fts_related = get_fts_related(instance, using)
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        update_fts_indexes(type(instance), [instance.pk], using)
+        if pk_set:
+            update_fts_indexes(model, list(pk_set), using)
+        for (indexed, search_fields), pks in instance.__dict__.pop('_itemlist_fts_related', {}).items():
+            if pks:
+                update_fts_rows(indexed, search_fields, using, pks)
+
+
+def connect_fts_signals():
+    if not getattr(settings, 'ITEMLIST_SEARCH_INDEXES', None):
+        return
+    post_save.connect(fts_object_saved, dispatch_uid='itemlist_fts_saved')
+    pre_delete.connect(fts_object_deleting, dispatch_uid='itemlist_fts_deleting')
+    post_delete.connect(fts_object_deleted, dispatch_uid='itemlist_fts_deleted')
+    m2m_changed.connect(fts_relation_changed, dispatch_uid='itemlist_fts_relation_changed')
+
+
+class TrigramContains(Lookup):
+    """
+    Case-insensitive containment using `ILIKE`, which PostgreSQL can answer from a GIN trigram index
+    (`gin_trgm_ops`) on the field, unlike the `UPPER(...) LIKE` used by `icontains`.
+    """
+    lookup_name = 'trigram_contains'
+    prepare_rhs = False
+
+    def get_db_prep_lookup(self, value, connection):
+        return '%s', ['%{}%'.format(connection.ops.prep_for_like_query(value))]
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        if self.lhs.output_field.get_internal_type() not in ('CharField', 'TextField'):
+            lhs = f'({lhs})::text'
+        return f'{lhs} ILIKE {rhs}', [*lhs_params, *rhs_params]
+
+
+class SearchBackend:
+    """
+    Base class for the backends used by ItemListView to search lists. Words of the search term are matched
+    using the OR operator.
+    """
+
+    def get_filter(self, queryset, search_fields, search_term):
+        """
+        Build the filter matching the search term
+        :param queryset: queryset to search
+        :param search_fields: search fields of the list
+        :param search_term: search string
+        :return: Q object
+        """
+        raise NotImplementedError
+
+    def needs_distinct(self, queryset, search_fields):
+        """
+        Whether the filter may produce duplicate rows, because it spans multi-valued relations
+        :return: bool
+        """
+        return any(lookup_needs_distinct(queryset.model._meta, field_name) for field_name in search_fields)
+
+    def get_rank(self, queryset, search_fields, search_term):
+        """
+        Optional expression ranking the matches, the results are ordered by decreasing rank.
+        :return: expression or None
+        """
+        return None
+
+    def search(self, queryset, search_fields, search_term):
+        """
+        Filter the queryset according to the search term
+        :return: tuple (queryset, distinct), distinct will be True if queryset is likely to contain duplicates
+        """
+        rank = self.get_rank(queryset, search_fields, search_term)
+        use_distinct = self.needs_distinct(queryset, search_fields)
+        queryset = queryset.filter(self.get_filter(queryset, search_fields, search_term))
+        if rank is not None:
+            queryset = queryset.annotate(rank=rank).order_by('-rank')
+        return queryset, use_distinct
+
+
+class ContainsSearch(SearchBackend):
+    """
+    Match words anywhere in the fields with `icontains`. Fields prefixed with '^' match the beginning of the
+    field, '=' match the whole field and '@' use the database full text search (`__search`).
+    """
+    default_lookup = 'icontains'
+
+    def get_lookup(self, field_name):
+        if field_name.startswith('^'):
+            return "{}__istartswith".format(field_name[1:])
+        elif field_name.startswith('='):
+            return "{}__iexact".format(field_name[1:])
+        elif field_name.startswith('@'):
+            return "{}__search".format(field_name[1:])
+        else:
+            return "{}__{}".format(field_name, self.default_lookup)
+
+    def get_condition(self, queryset, field_name, bit):
+        """
+        Build the condition matching a word of the search term in a field
+        :param queryset: queryset to search
+        :param field_name: search field, including its prefix
+        :param bit: word of the search term
+        :return: Q object
+        """
+        return models.Q(**{self.get_lookup(field_name): bit})
+
+    def get_filter(self, queryset, search_fields, search_term):
+        """
+        Conditions on fields spanning multi-valued relations are combined into a single correlated EXISTS
+        subquery, so that the results contain no duplicates and need no DISTINCT.
+        """
+        opts = queryset.model._meta
+        conditions, multi_valued = [], []
+        for bit in search_term.split():
+            for field_name in search_fields:
+                field_name = str(field_name)
+                condition = self.get_condition(queryset, field_name, bit)
+                if lookup_needs_distinct(opts, field_name.lstrip('^=@')):
+                    multi_valued.append(condition)
+                else:
+                    conditions.append(condition)
+        if multi_valued:
+            subquery = queryset.model._base_manager.filter(pk=models.OuterRef('pk')).filter(
+                reduce(operator.or_, multi_valued)
+            )
+            conditions.append(models.Q(models.Exists(subquery)))
+        return reduce(operator.or_, conditions)
+
+    def needs_distinct(self, queryset, search_fields):
+        return False
+
+
+class PrefixSearch(ContainsSearch):
+    """
+    Match words at the beginning of the fields, as if all fields were prefixed with '^'. Prefix matches can use
+    B-tree indexes, for example an index on `Upper(field)` with the `varchar_pattern_ops` operator class on
+    PostgreSQL. With `case_sensitive`, `startswith` is used instead, which can use a plain index with a pattern
+    operator class on PostgreSQL or a case-sensitive `LIKE` on SQLite.
+    """
+
+    def __init__(self, case_sensitive=False):
+        self.default_lookup = 'startswith' if case_sensitive else 'istartswith'
+
+
+class TrigramSearch(ContainsSearch):
+    """
+    Match words anywhere in the fields with `ILIKE` on PostgreSQL, which can use GIN trigram indexes from the
+    `pg_trgm` extension. With `similarity`, words are instead matched with the trigram similarity operator
+    (`%`), whose threshold is set by `pg_trgm.similarity_threshold`, and results are ranked by similarity.
+    Other databases fall back to `icontains`.
+    """
+
+    def __init__(self, similarity=False):
+        self.similarity = similarity
+
+    def get_condition(self, queryset, field_name, bit):
+        if connections[queryset.db].vendor != 'postgresql' or field_name[:1] in '^=@':
+            return super().get_condition(queryset, field_name, bit)
+        elif self.similarity:
+            return models.Q(**{f'{field_name}__trigram_similar': bit})
+        return models.Q(TrigramContains(F(field_name), bit))
+
+    def get_similarity(self, queryset, field_name, search_term):
+        """
+        Trigram similarity of a search field to the search term. Fields spanning multi-valued relations are
+        ranked by their most similar value in a correlated subquery, so that ranking does not join the relation
+        and repeat the results.
+        :param field_name: search field, without its prefix
+        :return: expression
+        """
+        from django.contrib.postgres.search import TrigramSimilarity
+        similarity = TrigramSimilarity(field_name, search_term)
+        if not lookup_needs_distinct(queryset.model._meta, field_name):
+            return similarity
+        subquery = queryset.model._base_manager.filter(pk=models.OuterRef('pk')).order_by().values('pk').annotate(
+            similarity=models.Max(similarity)
+        ).values('similarity')
+        return Coalesce(models.Subquery(subquery), 0.0, output_field=models.FloatField())
+
+    def get_rank(self, queryset, search_fields, search_term):
+        if not self.similarity or connections[queryset.db].vendor != 'postgresql':
+            return None
+        similarities = [
+            self.get_similarity(queryset, field_name, search_term)
+            for field_name in get_search_field_names(search_fields)
+        ]
+        return similarities[0] if len(similarities) == 1 else Greatest(*similarities)
+
+
+class FullTextSearch(SearchBackend):
+    """
+    PostgreSQL full text search of the phrase, ranked by relevance. Uses the stored search vector created by the
+    `itemlist_search_vector` management command if it exists.
+    """
+
+    def needs_distinct(self, queryset, search_fields):
+        return False
+
+    def search(self, queryset, search_fields, search_term):
+        from django.contrib.postgres.search import SearchRank, SearchQuery
+        search_query = SearchQuery(search_term, config='english', search_type='phrase')
+        vector = get_stored_vector(queryset.model, search_fields, queryset.db)
+        if vector is not None:
+            # the stored vector is indexed, match it first so that only matching rows are ranked
+            queryset = queryset.alias(**{VECTOR_ALIAS: vector}).filter(**{VECTOR_ALIAS: search_query})
+        else:
+            vector = get_search_vector(search_fields)
+        queryset = queryset.annotate(
+            rank=SearchRank(vector, search_query)
+        ).filter(
+            rank__gte=0.1
+        ).order_by(
+            '-rank'
+        )
+        return queryset, self.needs_distinct(queryset, search_fields)
+
+
+class FTS5Search(ContainsSearch):
+    """
+    Match words as prefixes of the indexed words using the SQLite FTS5 index created by the `itemlist_fts_index`
+    management command, for views listed in the `ITEMLIST_SEARCH_INDEXES` setting. Falls back to `icontains`
+    when the index is not available.
+    """
+
+    def search(self, queryset, search_fields, search_term):
+        fts_filter = get_fts_filter(queryset.model, search_fields, search_term, queryset.db)
+        if fts_filter is not None:
+            return queryset.filter(fts_filter), False
+        return super().search(queryset, search_fields, search_term)
+
+
+SEARCH_BACKENDS = {
+    'contains': ContainsSearch,
+    'prefix': PrefixSearch,
+    'trigram': TrigramSearch,
+    'fulltext': FullTextSearch,
+    'fts5': FTS5Search,
+}
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent by ItemListView when `record_timings` is enabled, with the `view`, the `request` and the `record` of the
+# timings returned by PhaseTimer.get_record()
+list_timed = Signal()
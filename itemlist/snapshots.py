@@ -0,0 +1,290 @@
+import copy
+import datetime
+import time
+from functools import lru_cache
+
+from django.apps.registry import Apps
+from django.conf import settings
+from django.core.exceptions import FieldError
+from django.db import connections, models, transaction
+from django.db.models.expressions import Col, Expression
+from django.db.models.sql.constants import LOUTER
+from django.db.models.sql.datastructures import Join
+from django.utils.module_loading import import_string
+
+from .cache import bump_model_version, get_cache, get_version_key
+from .columns import ANNOTATE, EXPRESSION, split_column
+from .search import get_index_name, set_table_exists, table_exists
+
+SNAPSHOT_PREFIX = 'itemlist_snapshot'
+STATE_TABLE = 'itemlist_snapshot_state'
+KEY_COLUMN = '_snapshot_pk'
+
+
+def get_snapshot_columns(view):
+    """
+    Return the columns of a list stored in its snapshot: the columns spanning relations which are annotated and
+    the columns computed by database expressions
+    """
+    return [column for column in view.get_column_plan() if column.fetch in (ANNOTATE, EXPRESSION)]
+
+
+def get_snapshot_column(column):
+    return f'_snapshot_{column.index}'
+
+
+def get_snapshot_table(view):
+    """
+    Name of the snapshot table of a list. The name changes with the columns stored, so that a stale snapshot is
+    never used after the columns of the list are changed.
+    """
+    list_columns = view.get_list_columns()
+    definitions = [
+        column.name if column.fetch == ANNOTATE else '{}={!r}'.format(*split_column(list_columns[column.index]))
+        for column in get_snapshot_columns(view)
+    ]
+    return get_index_name(SNAPSHOT_PREFIX, view.model, definitions)
+
+
+def get_snapshot_view(path):
+    """
+    Instantiate the list view with the given dotted path outside of a request
+    """
+    view = import_string(path)()
+    if view.model is None:
+        view.model = view.get_snapshot_queryset().model
+    return view
+
+
+def get_snapshot_source(view, using):
+    """
+    Return the queryset computing the rows of the snapshot of a list, the primary key followed by the values
+    of the stored columns
+    """
+    annotations = {
+        get_snapshot_column(column): models.F(column.name) if column.fetch == ANNOTATE else column.expression
+        for column in get_snapshot_columns(view)
+    }
+    queryset = view.get_snapshot_queryset().using(using).order_by()
+    return queryset.annotate(**{KEY_COLUMN: models.F('pk')}, **annotations).values_list(KEY_COLUMN, *annotations)
+
+
+class SnapshotRelation:
+    """
+    Join condition of the snapshot table of a list on the primary key of its rows, with an unmanaged model of
+    the table declared in a registry of its own, so that no relation is added to the models of the project.
+    """
+
+    def __init__(self, model, table):
+        key = getattr(model._meta.pk, 'target_field', model._meta.pk).clone()
+        key.db_column = KEY_COLUMN
+        meta = type('Meta', (), {
+            'apps': Apps(), 'app_label': model._meta.app_label, 'db_table': table, 'managed': False,
+        })
+        self.model = model
+        self.related_model = type('Snapshot', (models.Model,), {'__module__': __name__, 'key': key, 'Meta': meta})
+
+    def get_joining_fields(self):
+        return ((self.model._meta.pk, self.related_model._meta.pk),)
+
+    def get_joining_columns(self):
+        return ((self.model._meta.pk.column, KEY_COLUMN),)
+
+    def get_extra_restriction(self, alias, related_alias):
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_snapshot_relation(model, table):
+    return SnapshotRelation(model, table)
+
+
+class SnapshotColumn(Expression):
+    """
+    Reference to a stored column of the snapshot table of a list. The table is left joined once on the primary
+    key, the rows added since the snapshot was refreshed are listed with empty stored columns.
+    """
+
+    def __init__(self, table, column, output_field):
+        super().__init__(output_field=output_field)
+        self.table = table
+        self.column = column
+
+    def resolve_expression(self, query=None, allow_joins=True, reuse=None, summarize=False, for_save=False):
+        if not allow_joins:
+            raise FieldError('Joined field references are not permitted in this query')
+        relation = get_snapshot_relation(query.model._meta.concrete_model, self.table)
+        alias = query.join(Join(self.table, query.get_initial_alias(), None, LOUTER, relation, True))
+        target = copy.copy(self.output_field)
+        target.column = self.column
+        target.model = relation.related_model
+        return Col(alias, target, self.output_field)
+
+
+def get_snapshot_values(view, queryset, table):
+    """
+    Build the expressions reading the stored columns of a list from its snapshot table
+    :param view: the list view
+    :param queryset: the queryset of the list, used to determine the types of the columns
+    :param table: name of the snapshot table
+    :return: dictionary mapping column names to expressions
+    """
+    columns = get_snapshot_columns(view)
+    annotated = queryset.annotate(**{
+        get_snapshot_column(column): models.F(column.name) if column.fetch == ANNOTATE else column.expression
+        for column in columns
+    })
+    return {
+        column.name: SnapshotColumn(
+            table, get_snapshot_column(column),
+            output_field=annotated.query.annotations[get_snapshot_column(column)].output_field
+        )
+        for column in columns
+    }
+
+
+def set_refreshed(using, table, refreshed):
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {qn(STATE_TABLE)} '
+            f'({qn("name")} VARCHAR(64) PRIMARY KEY, {qn("refreshed")} BIGINT NOT NULL)'
+        )
+        cursor.execute(f'DELETE FROM {qn(STATE_TABLE)} WHERE {qn("name")} = %s', [table])
+        if refreshed is not None:
+            cursor.execute(
+                f'INSERT INTO {qn(STATE_TABLE)} ({qn("name")}, {qn("refreshed")}) VALUES (%s, %s)', [table, refreshed]
+            )
+
+
+def get_refreshed(using, table):
+    """
+    Return the time in nanoseconds at which the data of a snapshot was read, or None if unknown
+    """
+    if not table_exists(using, STATE_TABLE):
+        return None
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT {qn("refreshed")} FROM {qn(STATE_TABLE)} WHERE {qn("name")} = %s', [table])
+        row = cursor.fetchone()
+    return None if row is None else row[0]
+
+
+def get_snapshot_status(view, using, table):
+    """
+    Describe the freshness of the snapshot of a list
+    :return: dictionary with the time the snapshot was 'refreshed' and whether it is 'stale', because changes
+        to the models of the list were recorded since
+    """
+    refreshed = get_refreshed(using, table)
+    if refreshed is None:
+        return {'refreshed': None, 'stale': True}
+    versions = get_cache().get_many([get_version_key(model) for model in view.get_cache_models()])
+    return {
+        'refreshed': datetime.datetime.fromtimestamp(refreshed / 1e9, tz=datetime.timezone.utc),
+        'stale': any(version > refreshed for version in versions.values()),
+    }
+
+
+def invalidate_list(view, refreshed):
+    """
+    Invalidate the cached responses and filter choices of a list after its snapshot was refreshed. The version
+    of the model is set to the time the rows were read, unless it changed since, and the unknown versions of the
+    other models of the list are recorded at that time, so that the snapshot is not considered stale.
+    """
+    cache = get_cache()
+    version = cache.get(get_version_key(view.model))
+    if version is None or version < refreshed:
+        bump_model_version(view.model, refreshed)
+    for model in view.get_cache_models():
+        cache.add(get_version_key(model), refreshed, None)
+
+
+def drop_snapshot(view, using):
+    """
+    Remove the snapshot of a list
+    """
+    connection = connections[using]
+    table = get_snapshot_table(view)
+    kind = 'MATERIALIZED VIEW' if connection.vendor == 'postgresql' else 'TABLE'
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP {kind} IF EXISTS {connection.ops.quote_name(table)}')
+    set_table_exists(using, table, False)
+    if table_exists(using, STATE_TABLE):
+        set_refreshed(using, table, None)
+
+
+def create_snapshot(view, using):
+    """
+    Create the snapshot of a list, a materialized view on PostgreSQL and a table on other databases, with a
+    unique index on the primary key of the rows
+    :return: number of rows stored
+    """
+    if not get_snapshot_columns(view):
+        raise ValueError('the list has no columns spanning relations or computed by expressions to store')
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    table = get_snapshot_table(view)
+    sql, params = get_snapshot_source(view, using).query.get_compiler(using).as_sql()
+    kind = 'MATERIALIZED VIEW' if connection.vendor == 'postgresql' else 'TABLE'
+    refreshed = time.time_ns()
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(f'DROP {kind} IF EXISTS {qn(table)}')
+        cursor.execute(f'CREATE {kind} {qn(table)} AS {sql}', params)
+        cursor.execute(f'CREATE UNIQUE INDEX {qn(table + "_pk")} ON {qn(table)} ({qn(KEY_COLUMN)})')
+        cursor.execute(f'SELECT COUNT(*) FROM {qn(table)}')
+        count = cursor.fetchone()[0]
+        set_refreshed(using, table, refreshed)
+    set_table_exists(using, table, True)
+    set_table_exists(using, STATE_TABLE, True)
+    invalidate_list(view, refreshed)
+    return count
+
+
+def refresh_snapshot(view, using, concurrently=False):
+    """
+    Compute the rows of the snapshot of a list again, creating the snapshot if it does not exist. The rows are
+    replaced in a transaction, or concurrently with reads on PostgreSQL if `concurrently` is set.
+    :return: number of rows stored
+    """
+    table = get_snapshot_table(view)
+    if not table_exists(using, table):
+        return create_snapshot(view, using)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    refreshed = time.time_ns()
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'REFRESH MATERIALIZED VIEW {"CONCURRENTLY " if concurrently else ""}{qn(table)}')
+        else:
+            sql, params = get_snapshot_source(view, using).query.get_compiler(using).as_sql()
+            columns = [KEY_COLUMN] + [
+                get_snapshot_column(column) for column in get_snapshot_columns(view)
+            ]
+            cursor.execute(f'DELETE FROM {qn(table)}')
+            cursor.execute(f'INSERT INTO {qn(table)} ({", ".join(map(qn, columns))}) {sql}', params)
+        cursor.execute(f'SELECT COUNT(*) FROM {qn(table)}')
+        count = cursor.fetchone()[0]
+        set_refreshed(using, table, refreshed)
+    invalidate_list(view, refreshed)
+    return count
+
+
+def refresh_stale_snapshots(using, paths=None):
+    """
+    Refresh the existing snapshots which are stale, because the models of their lists changed since they were
+    refreshed. Meant to run periodically, from the `itemlist_snapshot` management command with `--stale` or
+    from a task queue, rather than after every change.
+    :param using: database alias
+    :param paths: dotted paths of the views, the views listed in the `ITEMLIST_SNAPSHOTS` setting by default
+    :return: dictionary mapping the paths of the refreshed views to their number of rows
+    """
+    refreshed = {}
+    for path in getattr(settings, 'ITEMLIST_SNAPSHOTS', []) if paths is None else paths:
+        view = get_snapshot_view(path)
+        table = get_snapshot_table(view)
+        if table_exists(using, table) and get_snapshot_status(view, using, table)['stale']:
+            refreshed[path] = refresh_snapshot(view, using, concurrently=True)
+    return refreshed
@@ -14,6 +14,11 @@ def show_row(context, obj):
     }
 
 
+@register.simple_tag(takes_context=True)
+def show_rows(context, object_list):
+    return context['view'].render_rows(object_list)
+
+
 @register.inclusion_tag('itemlist/filters.html', takes_context=True)
 def itemlist_filters(context):
     return context
@@ -30,6 +35,23 @@ def itemlist_list(context):
     return context
 
 
+@register.simple_tag
+def page_query(page, which):
+    """
+    Query string parameters for navigating from `page` to the 'first', 'previous', 'next' or 'last' page.
+    Supports both numbered pages and cursor pages.
+    """
+    if hasattr(page, 'get_page_query'):
+        return page.get_page_query(which)
+    number = {
+        'first': lambda: 1,
+        'previous': page.previous_page_number,
+        'next': page.next_page_number,
+        'last': lambda: page.paginator.num_pages,
+    }[which]()
+    return f'page={number}'
+
+
 @register.simple_tag(takes_context=True)
 def show_grid_cell(context, obj):
     context['object'] = obj
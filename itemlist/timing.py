@@ -0,0 +1,136 @@
+import threading
+import time
+import warnings
+from contextlib import ExitStack, contextmanager, nullcontext
+
+from django.db import connections
+
+
+class PhaseTimer:
+    """
+    Record the wall time and the number of database queries of the phases of a list request. The time and queries
+    of nested phases are only counted in the innermost phase. Phases may run concurrently in different threads.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = {}
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    def count_query(self, execute, sql, params, many, context):
+        self.local.queries += 1
+        return execute(sql, params, many, context)
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Record the time and queries of the enclosed block under the given phase name
+        :param name: name of the phase
+        """
+        stack = getattr(self.local, 'stack', None)
+        with ExitStack() as wrappers:
+            if not stack:
+                # count the queries of this thread while the outermost phase runs
+                self.local.stack = stack = []
+                self.local.queries = 0
+                for connection in connections.all():
+                    wrappers.enter_context(connection.execute_wrapper(self.count_query))
+            stack.append([0.0, 0])
+            start, queries = time.perf_counter(), self.local.queries
+            try:
+                yield
+            finally:
+                duration, count = time.perf_counter() - start, self.local.queries - queries
+                nested_duration, nested_count = stack.pop()
+                if stack:
+                    stack[-1][0] += duration
+                    stack[-1][1] += count
+                with self.lock:
+                    record = self.phases.setdefault(name, {'duration': 0.0, 'queries': 0})
+                    record['duration'] += duration - nested_duration
+                    record['queries'] += count - nested_count
+
+    def get_record(self):
+        """
+        Return the timings recorded so far
+        :return: dict with the total 'duration' in seconds and the 'phases', mapping phase names to dictionaries
+            with the 'duration' in seconds and the number of 'queries' of the phase
+        """
+        return {
+            'duration': time.perf_counter() - self.start,
+            'phases': {name: dict(record) for name, record in self.phases.items()},
+        }
+
+    def get_header(self):
+        """
+        Return the value of the Server-Timing header for the timings recorded so far
+        """
+        record = self.get_record()
+        metrics = [
+            '{};desc="{} queries";dur={:.1f}'.format(name, phase['queries'], phase['duration'] * 1000)
+            for name, phase in record['phases'].items()
+        ]
+        metrics.append('total;dur={:.1f}'.format(record['duration'] * 1000))
+        return ', '.join(metrics)
+
+
+def timed(view, name):
+    """
+    Return a context manager recording a phase in the timer of the view, or doing nothing if timing is disabled
+    :param view: the list view, or None
+    :param name: name of the phase
+    """
+    timer = getattr(view, 'timer', None)
+    return nullcontext() if timer is None else timer.phase(name)
+
+
+class ColumnQueriesWarning(RuntimeWarning):
+    """
+    Warning issued when a column of a list makes database queries for every row
+    """
+
+
+class RowQueryDetector:
+    """
+    Count the database queries made while the cells of each column are computed, to find the columns which make
+    queries for every row of the list.
+    """
+
+    def __init__(self):
+        self.columns = {}
+        self.queries = 0
+
+    def count_query(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    @contextmanager
+    def watch(self, name):
+        """
+        Count the queries made within the block for the column
+        :param name: column name
+        """
+        self.queries = 0
+        with ExitStack() as wrappers:
+            for connection in connections.all():
+                wrappers.enter_context(connection.execute_wrapper(self.count_query))
+            yield
+        if self.queries:
+            record = self.columns.setdefault(name, [0, 0])
+            record[0] += self.queries
+            record[1] += 1
+
+    def warn(self, view):
+        """
+        Warn about the columns which made queries for more than one row, and start counting again
+        :param view: the list view
+        """
+        for name, (queries, rows) in self.columns.items():
+            if rows > 1:
+                warnings.warn(
+                    f'Column "{name}" of {type(view).__name__} made {queries} queries for {rows} rows, declare '
+                    f'the relations it uses through `select_related` or `prefetch_related` attributes',
+                    ColumnQueriesWarning, stacklevel=2
+                )
+        self.columns = {}
@@ -1,22 +1,45 @@
-import operator
+import asyncio
+import csv
+import html
 import re
-from datetime import date, datetime, time
-from functools import reduce
 
+from asgiref.sync import async_to_sync, sync_to_async
 from django.apps import apps
-from django.contrib import admin
-from django.contrib.admin import FieldListFilter
+from django.conf import settings
+from django.contrib.admin import FieldListFilter, SimpleListFilter
 from django.contrib.admin.options import IncorrectLookupParameters
-from django.contrib.admin.utils import get_fields_from_path, prepare_lookup_value
-from django.core.exceptions import FieldDoesNotExist
-from django.db import models
-from django.db.models import F
-from django.urls import reverse_lazy
-from django.utils import timezone, safestring
+from django.contrib.admin.utils import NotRelationField, get_fields_from_path, prepare_lookup_value
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, models, router
+from django.http import StreamingHttpResponse
+from django.urls import get_script_prefix, get_urlconf, reverse
+from django.utils import safestring, translation
+from django.utils.cache import patch_vary_headers
 from django.utils.encoding import force_str
+from django.utils.html import conditional_escape, format_html, strip_tags
 from django.utils.http import urlencode
+from django.utils.text import slugify
 from django.views.generic import ListView
 
+from .cache import (
+    RESPONSE_PREFIX, get_cache, get_cached_filter_class, get_configured_models, get_model_admin, get_model_versions,
+    make_key, track_models,
+)
+from .columns import (
+    ANNOTATE, EXPRESSION, PREFETCH, SELECT, column_is_field, compile_column_plan, contains_aggregate, format_value,
+    get_column_name, get_column_option, get_column_title, get_expression_paths, split_column,
+)
+from .filters import get_filter_only_class
+from .links import compile_link_template
+from .routers import is_sticky, reading_from
+from .paginators import COUNT_STRATEGIES, CURSOR_VAR, CursorPaginator, ItemPaginator
+from .search import SEARCH_BACKENDS, FTS5Search, FullTextSearch, get_search_field_names, table_exists
+from .signals import list_timed
+from .snapshots import get_snapshot_status, get_snapshot_table, get_snapshot_values
+from .templatetags.itemlist import page_query
+from .timing import PhaseTimer, RowQueryDetector, timed
+
 try:
     from django.contrib.admin.utils import lookup_needs_distinct
 except ImportError:
@@ -27,40 +50,28 @@ ORDER_VAR = 'order'
 PAGE_VAR = 'page'
 SEARCH_VAR = 'search'
 CSV_VAR = 'csv'
+JSON_VAR = 'json'
+FRAGMENT_VAR = 'fragment'
+FRAGMENT_HEADER = 'X-ItemList-Fragment'
 GRID_VAR = 'grid'
 
 
-def column_is_field(model, name):
-    try:
-        model._meta.get_field(name)
-    except FieldDoesNotExist:
-        return False
-    return True
+class Echo:
+    """
+    File-like object which returns the written value instead of buffering it, for streaming csv.writer output.
+    """
 
+    def write(self, value):
+        return value
 
-def get_column_title(model, name):
-    opts = model._meta
-    if '__' not in name:
-        if column_is_field(model, name):
-            field = opts.get_field(name)
-            try:
-                return field.verbose_name.title()
-            except AttributeError:
-                return name.replace('_', ' ').title()
-        else:
-            attr = getattr(model, name, '')
-            try:
-                header = attr.short_description
-            except AttributeError:
-                header = name.replace('_', ' ')
-            return header.title()
-    else:
-        this, rest = name.split('__', 1)
-        field = opts.get_field(this)
-        try:
-            return field.verbose_name.title() + ' / ' + get_column_title(field.related_model(), rest)
-        except AttributeError:
-            return field.name.replace('_', ' ').title() + ' / ' + get_column_title(field.related_model(), rest)
+
+def get_field_list_filter_class(field):
+    """
+    Return the FieldListFilter class registered for the field, as selected by `FieldListFilter.create`
+    """
+    for test, list_filter_class in FieldListFilter._field_list_filters:
+        if test(field):
+            return list_filter_class
 
 
 class ItemListView(ListView):
@@ -78,17 +89,43 @@ class ItemListView(ListView):
     link_field = None
 
     add_facets = False
+    facet_limit = 100
+    project_columns = False
+    cache_filters = False
+    filter_cache_timeout = 300
+    cache_responses = False
+    response_cache_timeout = 300
+    cursor_pagination = False
+    count_strategy = None
+    search_backend = None
+    read_using = None
+    csv_chunk_size = 2000
+    json_chunk_size = 100
+    fast_rows = False
+    record_timings = False
+    detect_row_queries = None
+    materialized = False
 
     ordering = []
+    paginator_class = ItemPaginator
 
     template_name = "itemlist/item_list.html"
+    fragment_template_name = "itemlist/fragment.html"
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.column_attrs = {}
+        self.column_plan = None
+        self.link_template = None
         self.filter_specs = None
+        self.facet_queryset = None
+        self.facet_counts = {}
         self.has_filters = False
         self.pk_attname = 'pk'
+        self.snapshot_table = None
+        self.read_alias = None
+        self.timer = None
+        self.query_detector = None
 
     def get_list_columns(self):
         return self.list_columns
@@ -113,43 +150,434 @@ class ItemListView(ListView):
 
     def get_link_field(self):
         columns = self.get_list_columns()
-        return self.link_field if self.link_field is not None else columns[0]
+        return self.link_field if self.link_field is not None else get_column_name(columns[0])
+
+    def get_link_template(self):
+        """
+        Return the LinkTemplate for `link_url`, resolved once per process, or None if not available.
+        """
+        return compile_link_template(
+            self.link_url, self.get_link_kwarg(), urlconf=get_urlconf(), script_prefix=get_script_prefix(),
+            language=translation.get_language(),
+        )
 
     def get_link_url(self, obj):
-        if self.link_url:
-            return reverse_lazy(self.link_url, kwargs={self.get_link_kwarg(): getattr(obj, self.get_link_kwarg())})
-        else:
+        if not self.link_url:
             return None
 
+        kwarg = self.get_link_kwarg()
+        value = getattr(obj, kwarg)
+        if self.link_template is None:
+            # The first link of the request is reversed normally, the template is only used for the following
+            # rows if it reproduces the reversed URL exactly.
+            url = reverse(self.link_url, kwargs={kwarg: value})
+            template = self.get_link_template()
+            self.link_template = template if template is not None and template.format(value) == url else False
+            return url
+        elif self.link_template:
+            return self.link_template.format(value)
+        else:
+            return reverse(self.link_url, kwargs={kwarg: value})
+
     def get_list_title(self):
         return self.list_title if self.list_title else self.model._meta.verbose_name_plural.title()
 
     def get_link_attr(self, obj):
         return self.link_attr
 
+    def get_column_plan(self):
+        """
+        Return the compiled column plan, a tuple of `itemlist.columns.Column` descriptors for the list columns.
+        Plans are compiled once per model and column configuration and shared between requests.
+        """
+        if self.column_plan is None:
+            self.column_plan = compile_column_plan(
+                self.model,
+                tuple(self.get_list_columns()),
+                tuple(self.get_list_headers().items()),
+                tuple(self.get_list_transforms().items()),
+                tuple(self.get_list_styles().items()),
+                self.get_link_field() if self.get_list_columns() else None,
+                language=translation.get_language(),
+            )
+        return self.column_plan
+
+    def get_count_strategy(self):
+        """
+        Return the CountStrategy instance used by the paginator to count the items. `count_strategy` may be
+        a strategy instance or the name of one of the built-in strategies.
+        """
+        if isinstance(self.count_strategy, str):
+            return COUNT_STRATEGIES[self.count_strategy]()
+        return self.count_strategy
+
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        return self.paginator_class(
+            queryset, per_page, orphans=orphans, allow_empty_first_page=allow_empty_first_page,
+            count_strategy=self.get_count_strategy(), view=self, **kwargs
+        )
+
+    def get_detect_row_queries(self):
+        return settings.DEBUG if self.detect_row_queries is None else self.detect_row_queries
+
+    def get_read_using(self):
+        """
+        Return the database alias to read the list from, or None for the default routing. `read_using` may be
+        an alias or a callable taking the request. Clients marked by `StickyPrimaryMiddleware` after a write
+        read from the write database of the model instead.
+        """
+        if self.read_using is None:
+            return None
+        if is_sticky(self.request):
+            return router.db_for_write(self.model if self.model is not None else self.queryset.model)
+        return self.read_using(self.request) if callable(self.read_using) else self.read_using
+
+    def dispatch(self, request, *args, **kwargs):
+        self.timer = PhaseTimer() if self.record_timings else None
+        self.query_detector = RowQueryDetector() if self.get_detect_row_queries() else None
+        self.read_alias = self.get_read_using()
+        if self.read_alias is None:
+            return super().dispatch(request, *args, **kwargs)
+        with reading_from(self.read_alias):
+            return super().dispatch(request, *args, **kwargs)
+
+    def get(self, request, *args, **kwargs):
+        if CSV_VAR in request.GET:
+            return self.finish_timing(self.get_csv_response())
+        elif JSON_VAR in request.GET:
+            return self.finish_timing(self.get_json_response())
+        if self.cache_responses:
+            key, response = self.get_cached_response()
+            if response is not None:
+                return self.finish_timing(response)
+        response = super().get(request, *args, **kwargs)
+        patch_vary_headers(response, [FRAGMENT_HEADER])
+        if self.cache_responses:
+            response.add_post_render_callback(lambda rendered: self.cache_response(key, rendered))
+        if self.query_detector is not None:
+            response.add_post_render_callback(lambda rendered: self.query_detector.warn(self))
+        if self.timer is not None:
+            with timed(self, 'render'):
+                response.render()
+        return self.finish_timing(response)
+
+    def finish_timing(self, response):
+        """
+        Add the timings recorded by the view to the response as a Server-Timing header and send them with the
+        `list_timed` signal. Streamed responses only include the phases before streaming.
+        :param response: the response of the view
+        :return: the response
+        """
+        if self.timer is not None:
+            response['Server-Timing'] = self.timer.get_header()
+            list_timed.send(sender=type(self), view=self, request=self.request, record=self.timer.get_record())
+        return response
+
+    def get_cache_models(self):
+        """
+        Return the models whose changes invalidate cached responses: the list model and the models reached by
+        the field paths of the columns, search fields and filters.
+        """
+        model = self.model if self.model is not None else self.queryset.model
+        paths = [*get_search_field_names(self.get_list_search())]
+        for name, expression in map(split_column, self.get_list_columns()):
+            paths.extend(get_expression_paths(expression) if expression is not None else [name])
+        for list_filter in self.get_list_filters():
+            field = list_filter[0] if isinstance(list_filter, (tuple, list)) else list_filter
+            if isinstance(field, str):
+                paths.append(field)
+        cache_models = {model}
+        for path in paths:
+            try:
+                fields = get_fields_from_path(model, path)
+            except (FieldDoesNotExist, NotRelationField):
+                continue
+            cache_models.update(field.related_model for field in fields if field.related_model is not None)
+        return sorted(cache_models, key=lambda m: m._meta.label_lower)
+
+    def get_response_cache_key(self):
+        """
+        Return the cache key of the response, combining the view, the normalized query string including the
+        page, the requested fragment, the language and the versions of the models from `get_cache_models()`.
+        """
+        view_class = type(self)
+        params = urlencode(sorted((k, sorted(v)) for k, v in self.request.GET.lists()), doseq=True)
+        cache_models = self.get_cache_models()
+        track_models(*cache_models)
+        return make_key(
+            RESPONSE_PREFIX, f'{view_class.__module__}.{view_class.__qualname__}', sorted(self.kwargs.items()),
+            params, self.get_fragment(), translation.get_language(), self.read_alias,
+            get_model_versions(*cache_models),
+        )
+
+    def get_cached_response(self):
+        """
+        Look up the response of the request in the cache, recorded as the `cache` phase
+        :return: tuple (key, response), the response is None if it is not cached
+        """
+        with timed(self, 'cache'):
+            key = self.get_response_cache_key()
+            return key, get_cache().get(key)
+
+    def cache_response(self, key, response):
+        """
+        Store a rendered response for `response_cache_timeout` seconds. Responses which depend on the visitor,
+        because they set cookies or used the session or a CSRF token while rendering, are not stored.
+        """
+        session = getattr(self.request, 'session', None)
+        if (
+            response.status_code != 200 or response.cookies or getattr(session, 'accessed', False)
+            or self.request.META.get('CSRF_COOKIE_NEEDS_UPDATE') or self.request.META.get('CSRF_COOKIE_USED')
+        ):
+            return
+        get_cache().set(key, response, self.response_cache_timeout)
+
+    def get_json_page(self, paginator, page):
+        """
+        Paging information of the JSON response, with the query strings of the first, previous, next and last
+        pages, or None if the list is not paginated.
+        """
+        if page is None:
+            return None
+        query_string = self.get_query_string(remove=[CSV_VAR])
+        count_is_exact = getattr(paginator, 'count_is_exact', True)
+        links = {
+            'first': page.has_previous(),
+            'previous': page.has_previous(),
+            'next': page.has_next(),
+            'last': page.has_next(),
+        }
+        return {
+            'number': page.number,
+            'per_page': paginator.per_page,
+            'count': paginator.count,
+            'count_is_exact': count_is_exact,
+            'count_label': paginator.count_label if not count_is_exact else str(paginator.count),
+            'num_pages': paginator.num_pages,
+            'num_pages_label': paginator.num_pages_label if not count_is_exact else str(paginator.num_pages),
+            **{
+                which: f'{query_string}&{page_query(page, which)}' if enabled else None
+                for which, enabled in links.items()
+            }
+        }
+
+    def get_json_row(self, obj):
+        """
+        Return the cells of a row for the JSON response, as the HTML displayed in the cells of the list
+        :param obj: the row item
+        :return: list of str
+        """
+        return [conditional_escape(cell.get('text', cell.get('data', ''))) for cell in self.get_row(obj)]
+
+    def get_json_chunks(self, data, object_list):
+        """
+        Generator for the JSON response, the rows are encoded and sent `json_chunk_size` rows at a time after the
+        rest of the data.
+        :param data: dictionary of data to encode before the rows
+        :param object_list: the items of the rows
+        """
+        encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+        yield encoder.encode(data)[:-1] + ',"rows":['
+        chunk = []
+        separator = ''
+        for obj in object_list:
+            chunk.append(encoder.encode(self.get_json_row(obj)))
+            if len(chunk) == self.json_chunk_size:
+                yield separator + ','.join(chunk)
+                chunk, separator = [], ','
+        if chunk:
+            yield separator + ','.join(chunk)
+        yield ']}'
+        if self.query_detector is not None:
+            self.query_detector.warn(self)
+
+    def get_json_response(self):
+        """
+        Return the current page of the list, with the current filters, search and ordering applied, as JSON
+        containing the title, headers, filters, paging information and rows. Rows are arrays of cells and are
+        streamed without rendering templates.
+        """
+        self.object_list = self.get_queryset()
+        page_size = self.get_paginate_by(self.object_list)
+        if page_size:
+            paginator, page, object_list, is_paginated = self.paginate_queryset(self.object_list, page_size)
+        else:
+            paginator, page, object_list = None, None, self.object_list.iterator(chunk_size=self.csv_chunk_size)
+        if self.add_facets:
+            with timed(self, 'facets'):
+                self.facet_counts = self.get_facet_counts()
+
+        filters = []
+        with timed(self, 'filters'):
+            for spec in self.filter_specs:
+                title, choices, selected = self.get_filter_data(spec)
+                filters.append({
+                    'title': title,
+                    'selected': selected,
+                    'choices': [
+                        {key: choice.get(key) for key in ('display', 'selected', 'query_string')}
+                        for choice in choices
+                    ],
+                })
+        with timed(self, 'headers'):
+            headers = list(self.get_headers())
+        data = {
+            'title': self.get_list_title(),
+            'headers': headers,
+            'filters': filters,
+            'page': self.get_json_page(paginator, page),
+        }
+        return StreamingHttpResponse(self.get_json_chunks(data, object_list), content_type='application/json')
+
+    def get_fragment(self):
+        """
+        Return the part of the list requested through the `fragment` query parameter or the
+        `X-ItemList-Fragment` header: 'rows' for the rows, pagination and counts only, 'filters' to also
+        include the filters, or None for the complete page.
+        """
+        fragment = self.request.GET.get(FRAGMENT_VAR) or self.request.headers.get(FRAGMENT_HEADER)
+        if fragment is None:
+            return None
+        return 'filters' if fragment == 'filters' else 'rows'
+
+    def get_template_names(self):
+        if self.get_fragment():
+            return [self.fragment_template_name]
+        return super().get_template_names()
+
+    def get_csv_filename(self):
+        return '{}.csv'.format(slugify(self.get_list_title()) or 'export')
+
+    def get_csv_rows(self, queryset):
+        """
+        Generator for the rows of the CSV export, starting with the headers. Values are fetched directly with
+        `values_list()` when all columns are plain fields without transforms, otherwise model instances are
+        streamed in chunks and formatted through `get_row`, with any HTML markup removed.
+        :param queryset: the queryset to export
+        :return: generator of lists of strings
+        """
+        yield [strip_tags(force_str(header['text'])) for header in self.get_headers()]
+
+        list_columns = self.get_list_columns()
+        fields = self.get_csv_fields(queryset.model) if list_columns else None
+        if fields is not None:
+            choices = [dict(field.flatchoices) if field.choices else None for field in fields]
+            attrs = [self.column_attrs[get_column_name(column)] for column in list_columns]
+            rows = queryset.prefetch_related(None).values_list(*attrs).iterator(chunk_size=self.csv_chunk_size)
+            for row in rows:
+                yield [
+                    format_value(value if field_choices is None else field_choices.get(value, value))
+                    for value, field_choices in zip(row, choices)
+                ]
+        else:
+            for obj in queryset.iterator(chunk_size=self.csv_chunk_size):
+                row = []
+                for cell in self.get_row(obj):
+                    text = cell.get('text', cell.get('data', ''))
+                    if isinstance(text, safestring.SafeData):
+                        text = html.unescape(strip_tags(text))
+                    row.append(force_str(text))
+                yield row
+
+    def get_csv_fields(self, model):
+        """
+        Determine the model fields of the columns, if they can all be exported directly from the database
+        :param model: the model being exported
+        :return: list of fields or None if any column needs a model instance
+        """
+        if type(self).get_row is not ItemListView.get_row or self.get_list_transforms():
+            return None
+        fields = []
+        for field_name in map(get_column_name, self.get_list_columns()):
+            try:
+                path_fields = get_fields_from_path(model, field_name)
+            except (FieldDoesNotExist, AttributeError):
+                return None
+            field = path_fields[-1]
+            if field.is_relation or not field.concrete:
+                return None
+            if any(path_field.many_to_many or path_field.one_to_many for path_field in path_fields):
+                # several values per row
+                return None
+            fields.append(field)
+        return fields
+
+    def get_csv_response(self):
+        """
+        Stream the complete list, with the current filters, search and ordering applied, as a CSV file.
+        """
+        queryset = self.get_queryset()
+        writer = csv.writer(Echo())
+        response = StreamingHttpResponse(
+            (writer.writerow(row) for row in self.get_csv_rows(queryset)), content_type='text/csv'
+        )
+        response['Content-Disposition'] = 'attachment; filename="{}"'.format(self.get_csv_filename())
+        return response
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['query_string'] = self.get_query_string(remove=[PAGE_VAR, CSV_VAR])
-        context['headers'] = self.get_headers()
+        context['query_string'] = self.get_query_string(remove=[PAGE_VAR, CURSOR_VAR, CSV_VAR])
+        with timed(self, 'headers'):
+            context['headers'] = list(self.get_headers())
         context['num_columns'] = len(self.get_list_columns())
-        context['filters'] = [self.get_filter_data(spec) for spec in self.filter_specs]
+        context['fragment'] = self.get_fragment()
+        if context['fragment'] == 'rows':
+            # the filters are unchanged, the choices are not displayed
+            context['filters'] = []
+        else:
+            if self.add_facets:
+                with timed(self, 'facets'):
+                    self.facet_counts = self.get_facet_counts()
+            with timed(self, 'filters'):
+                context['filters'] = [self.get_filter_data(spec) for spec in self.filter_specs]
         context['has_filters'] = self.has_filters
         context['list_title'] = self.get_list_title()
+        context['snapshot'] = None
+        if self.snapshot_table is not None:
+            context['snapshot'] = get_snapshot_status(self, self.object_list.db, self.snapshot_table)
         return context
 
     def get_queryset(self, *args, **kwargs):
         qs = super().get_queryset()
+        if self.read_alias is not None:
+            qs = qs.using(self.read_alias)
         self.model = qs.model
         self.pk_attname = self.model._meta.pk.attname
+        self.column_plan = None
         self.column_attrs = {}
         annotation = {}
-        for i, field_name in enumerate(self.get_list_columns()):
-            if '__' in field_name:
-                name = '_column_{}'.format(i)
-                self.column_attrs[field_name] = name
-                annotation[name] = models.F(field_name)
+        expressions = {}
+
+        # serve the stored columns from the snapshot of the list
+        self.snapshot_table = self.get_snapshot_table(qs.db)
+        stored = {}
+        if self.snapshot_table is not None:
+            stored = get_snapshot_values(self, qs, self.snapshot_table)
+
+        for column in self.get_column_plan():
+            if column.name in stored:
+                expressions[column.attr] = stored[column.name]
+                self.column_attrs[column.name] = column.attr
+            elif column.fetch == EXPRESSION:
+                # aggregates are added after filtering, other expressions can be searched and filtered
+                if contains_aggregate(column.expression):
+                    annotation[column.name] = column.expression
+                else:
+                    expressions[column.name] = column.expression
+                self.column_attrs[column.name] = column.name
+            elif column.fetch == ANNOTATE:
+                annotation[column.attr] = models.F(column.name)
+                self.column_attrs[column.name] = column.attr
+            elif column.fetch == SELECT:
+                # sort by the related objects themselves
+                self.column_attrs[column.name] = column.name
+            elif column.fetch == PREFETCH:
+                # several values per row, the column can not be sorted
+                self.column_attrs[column.name] = None
             else:
-                self.column_attrs[field_name] = field_name
+                self.column_attrs[column.name] = column.attr
+        if expressions:
+            qs = qs.annotate(**expressions)
 
         params = dict(self.request.GET.items())
         search_text = params.get(SEARCH_VAR, '')
@@ -157,17 +585,26 @@ class ItemListView(ListView):
         if search_text and PAGE_VAR in params:
             self.kwargs[PAGE_VAR] = 1
 
+        # Facets are counted on the searched but unfiltered queryset
+        if self.add_facets:
+            self.facet_queryset = qs
+            if search_text:
+                with timed(self, 'search'):
+                    facet_qs, facet_use_distinct = self.get_search_results(qs, search_text)
+                self.facet_queryset = facet_qs.distinct() if facet_use_distinct else facet_qs
+
         # First, we collect all the declared list filters.
-        self.filter_specs, has_filters, filter_use_distinct = self.get_filters()
+        with timed(self, 'filters'):
+            self.filter_specs, has_filters, filter_use_distinct = self.get_filters()
         # Then, we let every list filter modify the queryset to its liking.
         for filter_spec in self.filter_specs:
-            new_qs = filter_spec.queryset(self.request, qs)
-            qs = new_qs if new_qs is not None else qs
+            qs = self.get_filter_queryset(filter_spec, qs)
 
         # Search
         search_use_distinct = False
         if search_text:
-            qs, search_use_distinct = self.get_search_results(qs, search_text)
+            with timed(self, 'search'):
+                qs, search_use_distinct = self.get_search_results(qs, search_text)
 
         self.has_filters = bool(search_text) or has_filters
 
@@ -181,21 +618,34 @@ class ItemListView(ListView):
         if search_use_distinct or filter_use_distinct:
             qs = qs.distinct()
 
-        # determine related fields and select and/or prefetch related fields
+        # determine related fields and select and/or prefetch related fields, columns spanning relations follow
+        # the joins planned for them, annotated paths need none
         to_select = []
         to_prefetch = []
-        for column in self.get_list_columns():
-            field_name = column.split('__')[0]
+        for column in self.get_column_plan():
+            if column.fetch == EXPRESSION:
+                continue
+            elif column.fetch is not None:
+                if column.select and column.select not in to_select:
+                    to_select.append(column.select)
+                if column.prefetch and column.prefetch not in to_prefetch:
+                    to_prefetch.append(column.prefetch)
+                continue
             try:
-                field = self.model._meta.get_field(field_name)
+                field = self.model._meta.get_field(column.name)
             except FieldDoesNotExist:
                 # not a field, perhaps a method or an annotation
                 pass
             else:
                 if isinstance(field, models.ForeignKey):
-                    to_select.append(field_name)
+                    to_select.append(column.name)
                 elif isinstance(field, models.ManyToManyField):
-                    to_prefetch.append(field_name)
+                    to_prefetch.append(column.name)
+
+        # relations declared by method and property columns and by transforms
+        declared_select, declared_prefetch = self.get_column_relations()
+        to_select.extend(declared_select)
+        to_prefetch.extend(declared_prefetch)
 
         if to_select:
             qs = qs.select_related(*to_select)
@@ -203,8 +653,139 @@ class ItemListView(ListView):
         if to_prefetch:
             qs = qs.prefetch_related(*to_prefetch)
 
+        # fetch only the fields needed by the columns
+        if self.project_columns:
+            projection = self.get_projection()
+            if projection is not None:
+                fields, related = projection
+                qs = qs.only(*fields)
+                if related:
+                    qs = qs.select_related(*related)
+
         return qs
 
+    def get_snapshot_queryset(self):
+        """
+        Return the queryset stored in the snapshot of the list when `materialized` is enabled, without the
+        filters, search and ordering of the list. It must not depend on the request, snapshots are refreshed
+        outside of requests.
+        """
+        return super().get_queryset()
+
+    def get_snapshot_table(self, using):
+        """
+        Return the name of the snapshot table serving the list, if `materialized` is enabled and the snapshot has
+        been created by the `itemlist_snapshot` management command, otherwise None. The view must be listed in the
+        `ITEMLIST_SNAPSHOTS` setting, so that the changes making the snapshot stale are tracked in every process.
+        :param using: database alias the list is read from
+        """
+        if not self.materialized:
+            return None
+        configured = get_configured_models()
+        if any(model._meta.concrete_model not in configured for model in self.get_cache_models()):
+            raise ImproperlyConfigured(
+                f'{type(self).__name__} is materialized but its models are not tracked, list the view in the '
+                f'ITEMLIST_SNAPSHOTS setting'
+            )
+        table = get_snapshot_table(self)
+        return table if table_exists(using, table) else None
+
+    def get_column_relations(self):
+        """
+        Collect the relations used by method and property columns and by transforms, declared through their
+        `select_related` and `prefetch_related` attributes, for example
+        `parent_name.select_related = ['institution__parent']`.
+        :return: tuple (select, prefetch) of lists of relation paths, or `Prefetch` objects for prefetch
+        """
+        select, prefetch = [], []
+        for column in self.get_column_plan():
+            declared = []
+            if column.field is None and column.expression is None and column.attr == column.name:
+                declared.append((
+                    get_column_option(self.model, column.name, 'select_related', ()),
+                    get_column_option(self.model, column.name, 'prefetch_related', ()),
+                ))
+            if column.transform is not None:
+                declared.append((
+                    getattr(column.transform, 'select_related', ()), getattr(column.transform, 'prefetch_related', ())
+                ))
+            for column_select, column_prefetch in declared:
+                select.extend(path for path in column_select if path not in select)
+                prefetch.extend(lookup for lookup in column_prefetch if lookup not in prefetch)
+        return select, prefetch
+
+    def get_projection(self):
+        """
+        Determine the fields to load for the list columns. Field columns are loaded directly, columns
+        spanning relations are annotated, while method and property columns, and transforms, must declare the
+        field paths they use through a `requires` attribute. Related objects displayed in a column are loaded
+        completely.
+        :return: tuple (fields, related) of field paths for `only()` and relations for `select_related()`, or
+            None if the fields needed can not be determined safely
+        """
+        plan = self.get_column_plan()
+        if not plan or type(self).get_row is not ItemListView.get_row:
+            return None
+
+        opts = self.model._meta
+        fields = {opts.pk.name}
+        required = set()
+        if self.link_url and column_is_field(self.model, self.get_link_kwarg()):
+            fields.add(self.get_link_kwarg())
+
+        for column in plan:
+            if column.transform is not None:
+                if not hasattr(column.transform, 'requires'):
+                    return None
+                required.update(column.transform.requires)
+            if column.fetch == EXPRESSION:
+                # computed by the database
+                continue
+            elif column.fetch is not None:
+                # annotated paths need no field, related objects followed by the column must not be deferred
+                required.update(lookup for lookup in (column.select, column.prefetch) if lookup)
+                continue
+            elif column.field is not None:
+                if column.field.concrete:
+                    fields.add(column.name)
+            else:
+                requires = get_column_option(self.model, column.name, 'requires')
+                if requires is None:
+                    return None
+                required.update(requires)
+                sort_field = get_column_option(self.model, column.name, 'sort_field')
+                if sort_field and column_is_field(self.model, sort_field):
+                    required.add(sort_field)
+
+        # the objects reached through the declared relations must not be deferred
+        select, prefetch = self.get_column_relations()
+        required.update(select)
+        required.update(getattr(lookup, 'prefetch_through', lookup) for lookup in prefetch)
+
+        loaded = {column.name for column in plan if column.field is not None and column.field.is_relation}
+        related = set()
+        for path in required:
+            try:
+                path_fields = get_fields_from_path(self.model, path)
+            except (FieldDoesNotExist, AttributeError):
+                return None
+
+            # keep the part of the path made of forward single-valued relations, multi-valued relations
+            # can not be restricted and are left to prefetching
+            names = []
+            for name, field in zip(path.split('__'), path_fields):
+                if not field.concrete or field.many_to_many:
+                    break
+                names.append(name)
+                if not field.is_relation:
+                    break
+            if not names or names[0] in loaded:
+                continue
+            fields.add('__'.join(names))
+            if len(names) > 1:
+                related.add('__'.join(names[:-1]))
+        return sorted(fields), sorted(related)
+
     def get_ordering_fields(self, queryset):
         """
         Returns the list of ordering fields for the object list.
@@ -229,17 +810,20 @@ class ItemListView(ListView):
                     prefix, index = order_field.rpartition('-')[1:]
                     field_name = column_fields[int(index)]
 
-                    if column_is_field(self.model, field_name):
+                    if field_name is None:
+                        # columns with several values per row can not be sorted
+                        continue
+                    elif column_is_field(self.model, field_name) or '__' in field_name:
                         ordering.append(prefix + field_name)
-                    elif queryset.query.annotations:
-                        # allow sorting by annotations
+                    elif field_name in queryset.query.annotations:
+                        # allow sorting by annotations and expression columns
                         ordering.append(prefix + field_name)
                     else:
                         # if the column is not a model field, not an annotation but has a sort_field attribute,
                         # use that # otherwise, ignore it
-                        attr = getattr(self.model, field_name, '')
-                        if hasattr(attr, 'sort_field'):
-                            ordering.append(prefix + attr.sort_field)
+                        sort_field = get_column_option(self.model, field_name, 'sort_field')
+                        if sort_field:
+                            ordering.append(prefix + sort_field)
                 except (IndexError, ValueError):
                     continue  # Invalid ordering specified, skip it.
 
@@ -252,6 +836,35 @@ class ItemListView(ListView):
 
         return ordering
 
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Paginate the queryset. If `cursor_pagination` is enabled, use keyset pagination based on the ordering
+        fields, otherwise fall back to the default offset pagination.
+        """
+        with timed(self, 'page'):
+            paginator = self.get_cursor_paginator(queryset, page_size) if self.cursor_pagination else None
+            if paginator is None:
+                paginator, page, object_list, is_paginated = super().paginate_queryset(queryset, page_size)
+                if self.timer is not None:
+                    # fetch the rows now rather than while rendering
+                    len(object_list)
+                return paginator, page, object_list, is_paginated
+            page = paginator.get_cursor_page(self.request.GET.get(CURSOR_VAR))
+            return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_cursor_paginator(self, queryset, page_size):
+        """
+        Return a CursorPaginator for the queryset, or None if its ordering does not support keyset pagination.
+        """
+        annotation_paths = {
+            attr: name for name, attr in self.column_attrs.items() if attr is not None and attr != name
+        }
+        paginator = CursorPaginator(
+            queryset, page_size, annotation_paths=annotation_paths, allow_empty_first_page=self.get_allow_empty(),
+            count_strategy=self.get_count_strategy(), view=self
+        )
+        return paginator if paginator.is_supported else None
+
     def get_query_string(self, new_params=None, remove=None):
         """
         Determine the persistent part of the query string for use in the template
@@ -262,7 +875,7 @@ class ItemListView(ListView):
         new_params = {} if new_params is None else new_params
         remove = [] if remove is None else remove
         params = dict(self.request.GET.items())
-        remove.extend([PAGE_VAR])
+        remove.extend([PAGE_VAR, CURSOR_VAR, FRAGMENT_VAR])
         for r in remove:
             for k in list(params):
                 if k.startswith(r):
@@ -276,6 +889,18 @@ class ItemListView(ListView):
         param_string = urlencode(sorted(params.items()), doseq=True)
         return f'?{param_string}'
 
+    def get_search_backend(self):
+        """
+        Return the SearchBackend instance used to search the list. `search_backend` may be a backend instance
+        or the name of one of the built-in backends. By default, PostgreSQL full text search is used if
+        `django.contrib.postgres` is installed, and `icontains` lookups otherwise.
+        """
+        if self.search_backend is None:
+            return FullTextSearch() if apps.is_installed('django.contrib.postgres') else FTS5Search()
+        elif isinstance(self.search_backend, str):
+            return SEARCH_BACKENDS[self.search_backend]()
+        return self.search_backend
+
     def get_search_results(self, queryset, search_term):
         """
         Generate a queryset according to the search term. Words in the search term are searched using the OR operator
@@ -283,46 +908,10 @@ class ItemListView(ListView):
         :param search_term: search string
         :return: tuple (queryset, distinct), distinct will be True if queryset is likely to contain duplicates
         """
-
-        def construct_search(field_name):
-            if field_name.startswith('^'):
-                return "{}__istartswith".format(field_name[1:])
-            elif field_name.startswith('='):
-                return "{}__iexact".format(field_name[1:])
-            elif field_name.startswith('@'):
-                return "{}__search".format(field_name[1:])
-            else:
-                return "{}__icontains".format(field_name)
-
-        opts = queryset.model._meta
         search_fields = self.get_list_search()
-        use_distinct = False
         if not search_fields and search_term:
-            return queryset, use_distinct
-
-        if apps.is_installed('django.contrib.postgres'):
-            from django.contrib.postgres.search import SearchVector, SearchRank, SearchQuery
-            # if the postgres search extension is installed, use the full text search
-            vector = reduce(
-                operator.__add__, (SearchVector(F(field_name), weight='A') for field_name in search_fields)
-            )
-            search_query = SearchQuery(search_term, config='english', search_type='phrase')
-            queryset = queryset.annotate(
-                rank=SearchRank(vector, search_query)
-            ).filter(
-                rank__gte=0.1
-            ).order_by(
-                '-rank'
-            )
-        else:
-            orm_lookups = [construct_search(str(search_field)) for search_field in search_fields]
-            queryset = queryset.filter(
-                reduce(operator.or_, [
-                    models.Q(**{orm_lookup: bit}) for bit in search_term.split() for orm_lookup in orm_lookups
-                ])
-            )
-            use_distinct = any(lookup_needs_distinct(opts, search_spec) for search_spec in orm_lookups)
-        return queryset, use_distinct
+            return queryset, False
+        return self.get_search_backend().search(queryset, search_fields, search_term)
 
     def get_headers(self):
         """
@@ -342,9 +931,7 @@ class ItemListView(ListView):
             for c in ordering_text.split('.') if c
         }
 
-        list_headers = self.get_list_headers()
-
-        for i, field_name in enumerate(self.get_list_columns()):
+        for i, column in enumerate(self.get_column_plan()):
             # generate new url for sorting through the table header
             # '': sorted asc, '-':sorted desc, '*': not sorted (ignore tag)
 
@@ -354,12 +941,9 @@ class ItemListView(ListView):
             sort_val = '.'.join(['{0}{1}'.format(d, c) for d, c in [field_tag] + rest_tags if d != '*'])
             header_url = self.get_query_string(new_params={ORDER_VAR: sort_val})
 
-            header_text = list_headers.get(field_name, get_column_title(self.model, field_name))
-            styles = self.get_list_styles()
-
             header = {
-                "text": header_text,
-                'style': ' '.join([sort_style, styles.get(field_name, '')]),
+                "text": column.title,
+                'style': ' '.join([sort_style, column.style]),
                 'url': header_url
             }
             yield header
@@ -370,63 +954,249 @@ class ItemListView(ListView):
         :param obj: the row item
         :return: dict
         """
-        list_columns = self.get_list_columns()
-        opts = obj._meta
-        if not list_columns:
+        plan = self.get_column_plan()
+        if not plan:
             yield {'data': obj, 'style': ''}
-        transforms = self.get_list_transforms()
-        styles = self.get_list_styles()
-        link_field = self.get_link_field()
 
-        for field_name in list_columns:
-            try:
-                field = opts.get_field(field_name)
-            except FieldDoesNotExist:
-                # For non-field list_display values, the value is either a method
-                # or a property
-                field = None
-
-            attr_name = self.column_attrs[field_name]
-            value = getattr(obj, attr_name, '')
-            if callable(value):
-                value = value()
-
-            if field_name in transforms:
-                value = safestring.mark_safe(transforms[field_name](value, obj))
-            elif isinstance(value, datetime):
-                value = timezone.localtime(value).strftime('%c')
-            elif isinstance(value, time):
-                value = value.strftime('%X')
-            elif isinstance(value, date):
-                value = value.strftime('%Y-%m-%d')
-            elif field and field.choices:
-                choice_method = 'get_{}_display'.format(field_name)
-                value = getattr(obj, choice_method)()
-            elif value is None:
-                value = ''
+        for column in plan:
+            if self.query_detector is None:
+                value = self.get_cell_text(obj, column)
             else:
-                value = str(value)
-
-            # replace text with link for link field of column
-            if field_name == link_field:
-                url = self.get_link_url(obj)
-                attr = self.get_link_attr(obj)
-                if url:
-                    if attr and attr != "href":
-                        value = safestring.mark_safe(
-                            '<a href="#0" {attr}="{url}">{value}</a>'.format(url=url, value=value, attr=attr))
-                    else:
-                        value = safestring.mark_safe('<a href="{href}">{value}</a>'.format(href=url, value=value))
+                with self.query_detector.watch(column.name):
+                    value = self.get_cell_text(obj, column)
+            yield {'text': value, 'style': column.style}
+
+    def get_cell_text(self, obj, column):
+        """
+        Return the text of a cell, transformed and linked
+        :param obj: the row item
+        :param column: the Column of the cell
+        """
+        value = column.get_value(obj)
+        if column.transform is not None:
+            value = safestring.mark_safe(column.transform(value, obj))
+        else:
+            value = column.get_text(value)
 
-            yield {'text': value, 'style': styles.get(field_name, '')}
+        # replace text with link for link field of column
+        if column.is_link:
+            value = self.get_link_html(obj, value)
+        return value
+
+    def get_link_html(self, obj, text):
+        """
+        Wrap the text of the link column in a link to the object, if it has a link URL
+        :param obj: the row item
+        :param text: the text of the column, escaped unless it is marked safe
+        :return: str
+        """
+        url = self.get_link_url(obj)
+        if not url:
+            return text
+        attr = self.get_link_attr(obj)
+        if attr and attr != "href":
+            return format_html('<a href="#0" {}="{}">{}</a>', attr, url, text)
+        return format_html('<a href="{}">{}</a>', url, text)
+
+    def render_rows(self, object_list):
+        """
+        Render the rows of the table body in a single pass, producing the same HTML as rendering `row.html` for
+        each item. Used instead of the template when `fast_rows` is enabled.
+        :param object_list: the items of the rows
+        :return: safe string of table rows
+        """
+        plan = self.get_column_plan()
+        if type(self).get_row is not ItemListView.get_row or not plan or self.query_detector is not None:
+            cell_tags = None
+        else:
+            cell_tags = [format_html('<td class="{}">', column.style) if column.style else '<td >' for column in plan]
+
+        parts = []
+        for obj in object_list:
+            parts.append('<tr>')
+            if cell_tags is None:
+                for cell in self.get_row(obj):
+                    style = cell.get('style')
+                    parts.append(format_html('<td class="{}">', style) if style else '<td >')
+                    parts.append(conditional_escape(cell.get('text', '')))
+                    parts.append('</td>')
+            else:
+                for column, cell_tag in zip(plan, cell_tags):
+                    value = column.get_value(obj)
+                    if column.transform is not None:
+                        text = str(column.transform(value, obj))
+                    else:
+                        text = conditional_escape(column.get_text(value))
+                    if column.is_link:
+                        text = self.get_link_html(obj, safestring.mark_safe(text))
+                    parts.append(cell_tag)
+                    parts.append(text)
+                    parts.append('</td>')
+            parts.append('</tr>')
+        return safestring.mark_safe(''.join(parts))
+
+    def get_filter_queryset(self, spec, queryset):
+        """
+        Apply a list filter to the queryset. Filters on fields spanning multi-valued relations are applied as
+        correlated EXISTS subqueries, so that the results contain no duplicates and need no DISTINCT.
+        :param spec: list filter
+        :param queryset: queryset to filter
+        :return: filtered queryset
+        """
+        field_path = getattr(spec, 'field_path', None)
+        if field_path and lookup_needs_distinct(self.model._meta, field_path):
+            subquery = spec.queryset(self.request, self.model._base_manager.all())
+            if subquery is None or not subquery.query.has_filters():
+                return queryset
+            return queryset.filter(models.Exists(subquery.filter(pk=models.OuterRef('pk'))))
+        new_qs = spec.queryset(self.request, queryset)
+        return new_qs if new_qs is not None else queryset
+
+    def get_facet_counts(self):
+        """
+        Count the items matching each choice of each filter, within the current search and the other active
+        filters. Filters which share the same other active filters are counted together in a single query using
+        conditional aggregation, so that at most one query per active filter plus one is needed. Filters with more
+        than `facet_limit` choices are not counted.
+        :return: dictionary mapping filter specs to dictionaries of counts
+        """
+        active = [spec for spec in self.filter_specs if getattr(spec, 'used_parameters', None)]
+        groups = {}
+        for spec in self.filter_specs:
+            others = tuple(other for other in active if other is not spec)
+            groups.setdefault(others, []).append(spec)
+
+        facet_counts = {}
+        for others, specs in groups.items():
+            queryset = self.facet_queryset
+            for other in others:
+                queryset = self.get_filter_queryset(other, queryset)
+
+            aggregates = {}
+            for i, spec in enumerate(specs):
+                counts = self.get_filter_facet_counts(spec, queryset)
+                if counts and len(counts) <= self.facet_limit:
+                    aggregates.update({f'{i}_{key}': count for key, count in counts.items()})
+            if not aggregates:
+                continue
+
+            results = queryset.order_by().aggregate(**aggregates)
+            for i, spec in enumerate(specs):
+                prefix = f'{i}_'
+                counts = {key[len(prefix):]: value for key, value in results.items() if key.startswith(prefix)}
+                if counts:
+                    facet_counts[spec] = counts
+        return facet_counts
+
+    def get_filter_facet_counts(self, spec, queryset):
+        """
+        Return the conditional aggregates counting the items for each choice of the filter
+        :param spec: list filter
+        :param queryset: queryset filtered by the search and the other active filters
+        :return: dictionary of Count aggregates or None if the filter can not be counted
+        """
+        if hasattr(spec, 'get_facet_counts'):
+            try:
+                return spec.get_facet_counts(self.pk_attname, queryset)
+            except NotImplementedError:
+                return None
+        elif isinstance(spec, SimpleListFilter):
+            # Django < 5.0 filters do not provide facet counts
+            original_value = spec.used_parameters.get(spec.parameter_name)
+            counts = {}
+            for i, choice in enumerate(spec.lookup_choices):
+                spec.used_parameters[spec.parameter_name] = choice[0]
+                lookup_qs = spec.queryset(self.request, queryset)
+                if lookup_qs is not None:
+                    counts[f'{i}__c'] = models.Count(self.pk_attname, filter=models.Q(pk__in=lookup_qs))
+            spec.used_parameters[spec.parameter_name] = original_value
+            return counts
+        return None
 
     def get_filter_data(self, flt):
         title = flt.title
-        choices = list(flt.choices(self))
+        counts = self.facet_counts.get(flt)
+        if hasattr(flt, 'get_facet_queryset'):
+            # The filter displays the counts itself, using the precomputed counts instead of its own query
+            if counts is not None:
+                flt.get_facet_queryset = lambda changelist: counts
+            add_facets, self.add_facets = self.add_facets, self.add_facets and counts is not None
+            choices = list(flt.choices(self))
+            self.add_facets = add_facets
+        else:
+            choices = list(flt.choices(self))
+            if counts is not None and isinstance(flt, SimpleListFilter):
+                for i, choice in enumerate(choices[1:len(flt.lookup_choices) + 1]):
+                    choice['display'] = '{} ({})'.format(choice['display'], counts.get(f'{i}__c', '-'))
         choice_list = [choice['display'] for choice in choices if choice['selected']]
         selected = None if not choice_list else choice_list[0]
         return title, choices, selected
 
+    def get_cached_filter_class(self, filter_class, name, *sources):
+        """
+        Return a subclass of the list filter class which caches its choices for `filter_cache_timeout` seconds.
+        The cached choices are invalidated when the list model or any of the `sources` models change.
+        :param filter_class: list filter class
+        :param name: name identifying the filter within the view
+        :param sources: other models the choices are computed from
+        """
+        view_class = type(self)
+        key = f'{view_class.__module__}.{view_class.__qualname__}:{self.model._meta.label_lower}:{name}'
+        track_models(self.model, *sources)
+        return get_cached_filter_class(filter_class, key, (self.model, *sources), self.filter_cache_timeout)
+
+    def get_filter_spec(self, list_filter, params):
+        """
+        Create the list filter instance for an entry of `list_filters`. The filter removes the parameters it
+        uses from `params`.
+        :param list_filter: list filter class, field path, field or (field, filter class) tuple
+        :param params: filter parameters from the query string
+        """
+        # the choices are not displayed with the rows fragment
+        filter_only = self.get_fragment() == 'rows'
+        if callable(list_filter):
+            # This is simply a custom list filter class.
+            if self.cache_filters:
+                list_filter = self.get_cached_filter_class(list_filter, list_filter.parameter_name)
+            if filter_only:
+                list_filter = get_filter_only_class(list_filter)
+            return list_filter(self.request, params, self.model, None)
+        else:
+            field_path = None
+            if isinstance(list_filter, (tuple, list)):
+                # Custom FieldListFilter class for a given field.
+                field, field_list_filter_class = list_filter
+            else:
+                # Field name, so use the default registered FieldListFilter
+                field, field_list_filter_class = list_filter, FieldListFilter.create
+
+            if not isinstance(field, models.Field):
+                field_path = field
+                field = get_fields_from_path(self.model, field_path)[-1]
+            model_admin = get_model_admin(self.model)
+            if (self.cache_filters or filter_only) and field_list_filter_class == FieldListFilter.create:
+                field_list_filter_class = get_field_list_filter_class(field)
+            if self.cache_filters:
+                sources = (field.related_model,) if field.is_relation else ()
+                field_list_filter_class = self.get_cached_filter_class(
+                    field_list_filter_class, field_path or field.name, *sources
+                )
+            if filter_only:
+                field_list_filter_class = get_filter_only_class(field_list_filter_class)
+            return field_list_filter_class(
+                field, self.request, params, self.model, model_admin,
+                field_path=field_path
+            )
+
+    def get_filter_specs(self, params):
+        """
+        Create the list filters which have output
+        :param params: filter parameters from the query string, the parameters used by the filters are removed
+        :return: list of list filter instances
+        """
+        specs = [self.get_filter_spec(list_filter, params) for list_filter in self.get_list_filters()]
+        return [spec for spec in specs if spec and spec.has_output()]
+
     def get_filters(self):
         params = dict(self.request.GET.lists())
         opts = self.model._meta
@@ -437,33 +1207,7 @@ class ItemListView(ListView):
         list_names = [f if isinstance(f, str) else f.parameter_name for f in list_filters]
         new_params = {force_str(k): v for k, v in params.items() if k.startswith(tuple(list_names))}
         has_filters = bool(new_params)
-
-        filter_specs = []
-        for list_filter in list_filters:
-            if callable(list_filter):
-                # This is simply a custom list filter class.
-                spec = list_filter(self.request, new_params, self.model, None)
-            else:
-                field_path = None
-                if isinstance(list_filter, (tuple, list)):
-                    # Custom FieldListFilter class for a given field.
-                    field, field_list_filter_class = list_filter
-                else:
-                    # Field name, so use the default registered FieldListFilter
-                    field, field_list_filter_class = list_filter, FieldListFilter.create
-
-                if not isinstance(field, models.Field):
-                    field_path = field
-                    field = get_fields_from_path(self.model, field_path)[-1]
-                model_admin = admin.ModelAdmin(self.model, admin.site)
-                spec = field_list_filter_class(
-                    field, self.request, new_params, self.model, model_admin,
-                    field_path=field_path
-                )
-                # Check if we need to use distinct()
-                use_distinct = (use_distinct or lookup_needs_distinct(opts, field_path))
-            if spec and spec.has_output():
-                filter_specs.append(spec)
+        filter_specs = self.get_filter_specs(new_params)
 
         # All the parameters used by the various ListFilters have been removed
         # lookup_params, now only contains other parameters passed via the query string.
@@ -477,3 +1221,138 @@ class ItemListView(ListView):
             return filter_specs, has_filters, use_distinct
         except FieldDoesNotExist as e:
             raise IncorrectLookupParameters from e
+
+
+class AsyncItemListView(ItemListView):
+    """
+    ItemListView for ASGI deployments. The independent queries of a page, the lookups of the list filters,
+    the count, the rows of the page and the facet counts, are run concurrently.
+    """
+    concurrent_queries = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_paginator = None
+        self.prepared_facet_counts = None
+
+    async def run_query(self, func, *args):
+        """
+        Run a function making database queries from async code. With `concurrent_queries`, every call runs in
+        its own thread with its own database connection, closed afterwards, otherwise the calls share the
+        thread and connection of the synchronous code.
+        """
+        if not self.concurrent_queries:
+            return await sync_to_async(func)(*args)
+
+        def run():
+            try:
+                return func(*args)
+            finally:
+                connections.close_all()
+        return await sync_to_async(run, thread_sensitive=False)()
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.timer = PhaseTimer() if self.record_timings else None
+        self.query_detector = RowQueryDetector() if self.get_detect_row_queries() else None
+        self.read_alias = self.get_read_using()
+        if self.read_alias is None:
+            return await super(ItemListView, self).dispatch(request, *args, **kwargs)
+        with reading_from(self.read_alias):
+            return await super(ItemListView, self).dispatch(request, *args, **kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        if CSV_VAR in request.GET or JSON_VAR in request.GET:
+            return await sync_to_async(super().get)(request, *args, **kwargs)
+        if self.cache_responses:
+            key, response = await sync_to_async(self.get_cached_response)()
+            if response is not None:
+                return self.finish_timing(response)
+        self.object_list = await sync_to_async(self.get_queryset)()
+        await self.aprepare(self.object_list)
+        context = await sync_to_async(self.get_context_data)()
+        response = self.render_to_response(context)
+        patch_vary_headers(response, [FRAGMENT_HEADER])
+        if self.cache_responses:
+            response.add_post_render_callback(lambda rendered: self.cache_response(key, rendered))
+        if self.query_detector is not None:
+            response.add_post_render_callback(lambda rendered: self.query_detector.warn(self))
+        if self.timer is not None:
+            await self.run_query(self.render_timed, response)
+        return self.finish_timing(response)
+
+    def render_timed(self, response):
+        with timed(self, 'render'):
+            response.render()
+
+    async def aprepare(self, queryset):
+        """
+        Count the items, fetch the rows of the requested page and count the facets concurrently, before the
+        context is built from the results.
+        :param queryset: the filtered queryset of the list
+        """
+        queries = []
+        page_size = self.get_paginate_by(queryset)
+        if page_size:
+            paginator = self.get_cursor_paginator(queryset, page_size) if self.cursor_pagination else None
+            if paginator is not None:
+                page = self.request.GET.get(CURSOR_VAR)
+            else:
+                paginator = self.get_paginator(
+                    queryset, page_size, orphans=self.get_paginate_orphans(),
+                    allow_empty_first_page=self.get_allow_empty()
+                )
+                page = str(self.kwargs.get(self.page_kwarg) or self.request.GET.get(self.page_kwarg) or 1)
+                # 'last' and invalid pages need the count, they are fetched afterwards
+                page = int(page) if page.isdigit() and int(page) > 0 else None
+            self.prepared_paginator = paginator
+            queries.append(self.run_query(lambda: paginator.count_info))
+            if page is not None or isinstance(paginator, CursorPaginator):
+                queries.append(self.run_query(self.prefetch_page, paginator, page))
+
+        count_facets = self.add_facets and self.get_fragment() != 'rows'
+        if count_facets:
+            queries.append(self.run_query(self.get_timed_facet_counts))
+        results = await asyncio.gather(*queries)
+        if count_facets:
+            self.prepared_facet_counts = results[-1]
+
+    def prefetch_page(self, paginator, page):
+        with timed(self, 'page'):
+            paginator.prefetch_page(page)
+
+    async def aget_filter_specs(self, params):
+        """
+        Create the list filters concurrently, each with its own copy of the parameters. The parameters used by
+        any of the filters are then removed from `params`.
+        """
+        list_filters = self.get_list_filters()
+        copies = [dict(params) for _ in list_filters]
+        specs = await asyncio.gather(*(
+            self.run_query(self.get_filter_spec, list_filter, copy) for list_filter, copy in zip(list_filters, copies)
+        ))
+        for copy in copies:
+            for key in set(params) - set(copy):
+                params.pop(key, None)
+        return [spec for spec in specs if spec and spec.has_output()]
+
+    def get_filter_specs(self, params):
+        return async_to_sync(self.aget_filter_specs)(params)
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        if self.prepared_paginator is not None:
+            return self.prepared_paginator
+        return super().get_paginator(queryset, per_page, **kwargs)
+
+    def get_cursor_paginator(self, queryset, page_size):
+        if self.prepared_paginator is not None:
+            return self.prepared_paginator
+        return super().get_cursor_paginator(queryset, page_size)
+
+    def get_timed_facet_counts(self):
+        with timed(self, 'facets'):
+            return self.get_facet_counts()
+
+    def get_facet_counts(self):
+        if self.prepared_facet_counts is not None:
+            return self.prepared_facet_counts
+        return super().get_facet_counts()